@@ -0,0 +1,233 @@
+"""Incremental static asset sync."""
+from manifest import BuildManifest, hash_file
+from buildlog import get_log
+from blockcache import get_block_cache
+from fnmatch import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+# {original path: fingerprinted path} of the assets, written to the output when fingerprinting.
+ASSET_MANIFEST = "asset-manifest.json"
+# hex digits of the content hash put into fingerprinted names.
+FINGERPRINT_LENGTH = 8
+# file names served at a fixed URL, placed under their own name when fingerprinting;
+# so are dotfiles and anything under a dot directory such as .well-known/.
+FINGERPRINT_EXCLUDE = ("robots.txt", "favicon.ico", "*.html")
+ATTRIBUTE_URL_RE = re.compile(r"""\b(src|href)=(["'])(.*?)\2""")
+
+# ioctl request number for FICLONE on Linux (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+
+def sync_files(source:str, destination:str, manifest:BuildManifest, link_mode:str="copy", checksum:bool=False, fingerprint:bool=False) -> dict:
+    """Bring destination in line with source, only touching new, changed or deleted assets.
+
+    Assets are compared by size and mtime against what the manifest recorded at
+    the last sync, or by content hash when checksum is set. With fingerprint,
+    each asset but those keeps_name excludes is placed as name.<content hash>.ext
+    and the mapping from original to fingerprinted paths is written to ASSET_MANIFEST.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Invalid link mode {link_mode}.")
+    if not os.path.exists(source):
+        raise Exception("Source does not exist.")
+    os.makedirs(destination, exist_ok=True)
+
+    log = get_log()
+    stats = {"copied": 0, "unchanged": 0, "removed": 0}
+    previous = manifest.assets
+    current = {}
+    for dir_path, dir_names, file_names in os.walk(source):
+        dir_names.sort()
+        rel_dir = os.path.relpath(dir_path, source)
+        for file_name in sorted(file_names):
+            rel_path = os.path.normpath(os.path.join(rel_dir, file_name))
+            src_path = os.path.join(source, rel_path)
+            dest_path = os.path.join(destination, rel_path)
+            stat = os.stat(src_path)
+            entry = [stat.st_size, stat.st_mtime_ns, None, rel_path]
+            old = previous.get(rel_path)
+            if checksum or (fingerprint and (old is None or old[:2] != entry[:2] or old[2] is None)):
+                entry[2] = hash_file(src_path)
+            elif fingerprint:
+                # size and mtime unchanged: trust the hash of the last sync.
+                entry[2] = old[2]
+            if fingerprint and not keeps_name(rel_path):
+                entry[3] = fingerprinted_path(rel_path, entry[2])
+                dest_path = os.path.join(destination, entry[3])
+            current[rel_path] = entry
+            old_dest = None if old is None else os.path.join(destination, asset_output(rel_path, old))
+            if old_dest is not None and old_dest != dest_path and os.path.exists(old_dest):
+                os.remove(old_dest)
+            if not asset_changed(old, entry, dest_path, checksum):
+                stats["unchanged"] += 1
+                continue
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            place_file(src_path, dest_path, link_mode)
+            log.info(f"{rel_path} copied.")
+            log.event("asset_copied", path=rel_path)
+            stats["copied"] += 1
+
+    for rel_path, entry in previous.items():
+        if rel_path in current:
+            continue
+        dest_path = os.path.join(destination, asset_output(rel_path, entry))
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), destination)
+        log.info(f"{rel_path} removed.")
+        log.event("asset_removed", path=rel_path)
+        stats["removed"] += 1
+
+    manifest.assets = current
+    asset_manifest = os.path.join(destination, ASSET_MANIFEST)
+    if fingerprint:
+        tmp_path = f"{asset_manifest}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as asset_manifest_file:
+            json.dump({rel_path: entry[3] for rel_path, entry in current.items()}, asset_manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, asset_manifest)
+    elif ASSET_MANIFEST not in current and os.path.exists(asset_manifest):
+        os.remove(asset_manifest)
+    return stats
+
+
+def fingerprinted_path(rel_path:str, content_hash:str) -> str:
+    """Return rel_path with the start of its content hash before the extension, e.g. index.3fa9c1d2.css."""
+    root, extension = os.path.splitext(rel_path)
+    return f"{root}.{content_hash[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def keeps_name(rel_path:str) -> bool:
+    """Return True if the asset has to keep its name when fingerprinting: dotfiles, dot directories and FINGERPRINT_EXCLUDE."""
+    parts = rel_path.split(os.sep)
+    if any(part.startswith(".") for part in parts):
+        return True
+    return any(fnmatch(parts[-1], pattern) for pattern in FINGERPRINT_EXCLUDE)
+
+
+def asset_output(rel_path:str, entry:list) -> str:
+    """Return where an asset recorded in the manifest was placed, relative to the output."""
+    return entry[3] if len(entry) > 3 else rel_path
+
+
+def asset_urls(manifest:BuildManifest) -> dict[str, str]:
+    """Return {site URL: fingerprinted site URL} of the assets placed under another name."""
+    urls = {}
+    for rel_path, entry in manifest.assets.items():
+        output = asset_output(rel_path, entry)
+        if output != rel_path:
+            urls["/" + rel_path.replace(os.sep, "/")] = "/" + output.replace(os.sep, "/")
+    return urls
+
+
+_asset_urls = {}
+_asset_urls_digest = None
+
+
+def get_asset_urls() -> dict[str, str]:
+    """Return the asset URL map of the current process."""
+    return _asset_urls
+
+
+def set_asset_urls(urls:dict[str, str]) -> None:
+    """Install the asset URL map rendering rewrites references through.
+
+    Cached block HTML holds rewritten URLs, so the block cache is cleared
+    when the map changes.
+    """
+    global _asset_urls, _asset_urls_digest
+    if urls == _asset_urls:
+        return
+    _asset_urls = urls
+    _asset_urls_digest = None
+    if len(urls) > 0:
+        _asset_urls_digest = hashlib.sha256(json.dumps(urls, sort_keys=True).encode()).hexdigest()
+    get_block_cache().clear()
+
+
+def asset_urls_digest() -> str|None:
+    """Return a hash of the asset URL map, or None when no URL is rewritten."""
+    return _asset_urls_digest
+
+
+def asset_url(url:str) -> str:
+    """Return the fingerprinted URL of an asset, keeping any query or fragment; other URLs are unchanged.
+
+    Only root-absolute URLs (/css/index.css) are looked up: templates and
+    cached blocks are shared between pages, so a relative URL has no single
+    page directory to be resolved against.
+    """
+    if len(_asset_urls) == 0:
+        return url
+    split = len(url)
+    for separator in "?#":
+        index = url.find(separator)
+        if index != -1:
+            split = min(split, index)
+    rewritten = _asset_urls.get(url[:split])
+    return url if rewritten is None else rewritten + url[split:]
+
+
+def rewrite_asset_urls(text:str) -> str:
+    """Rewrite the src and href attributes of HTML text that point at fingerprinted assets."""
+    if len(_asset_urls) == 0:
+        return text
+    return ATTRIBUTE_URL_RE.sub(lambda match: f"{match.group(1)}={match.group(2)}{asset_url(match.group(3))}{match.group(2)}", text)
+
+
+def asset_changed(previous:list|None, current:list, dest_path:str, checksum:bool) -> bool:
+    """Return True if the asset has to be placed in the destination again."""
+    if previous is None or not os.path.exists(dest_path):
+        return True
+    if os.path.getsize(dest_path) != current[0] or previous[0] != current[0]:
+        return True
+    if checksum:
+        return previous[2] != current[2]
+    return previous[1] != current[1]
+
+
+def place_file(src_path:str, dest_path:str, link_mode:str) -> None:
+    """Place src_path at dest_path, falling back to a byte copy if linking is not possible."""
+    if os.path.lexists(dest_path):
+        if link_mode == "hardlink" and os.path.samefile(src_path, dest_path):
+            return
+        os.remove(dest_path)
+    if link_mode == "hardlink":
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    if link_mode == "reflink" and reflink(src_path, dest_path):
+        return
+    shutil.copy2(src_path, dest_path)
+
+
+def reflink(src_path:str, dest_path:str) -> bool:
+    """Clone src_path into dest_path copy-on-write, returning False if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+    except OSError:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        return False
+    shutil.copystat(src_path, dest_path)
+    return True
+
+
+def remove_empty_dirs(directory:str, root:str) -> None:
+    """Remove directory and its parents while they are empty, stopping at root."""
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root) and len(os.listdir(directory)) == 0:
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
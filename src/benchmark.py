@@ -0,0 +1,348 @@
+"""Benchmarks for the markdown pipeline."""
+from main import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, markdown_to_html, markdown_to_html_string, copy_files, sync_files, main as build_main
+from manifest import BuildManifest
+from textnode import TextNode, text_node_to_html_node
+from htmlnode import LeafNode, ParentNode
+from contextlib import redirect_stdout
+import argparse
+import datetime
+import io
+import json
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+CORPUS_KINDS = ("many-small", "few-huge", "inline-dense", "deep-nesting", "large-static", "shared-fragments")
+
+# run history at the repository root, wherever the benchmarks are run from.
+RESULTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".bench", "results.jsonl")
+
+TEMPLATE = "<!DOCTYPE html>\n<html>\n<head><title> {{ Title }} </title></head>\n<body><article>{{ Content }}</article></body>\n</html>"
+
+
+def best_of(func, *args, repeat:int=5) -> float:
+    """Return the fastest wall time in seconds of repeat calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def inline_paragraph(spans:int) -> str:
+    """Return a paragraph with the given number of mixed inline spans."""
+    parts = []
+    for index in range(spans):
+        kind = index % 5
+        if kind == 0:
+            parts.append(f"some **bold {index}** text")
+        elif kind == 1:
+            parts.append(f"some *italic {index}* text")
+        elif kind == 2:
+            parts.append(f"some `code {index}` text")
+        elif kind == 3:
+            parts.append(f"an ![image {index}](/images/{index}.png) here")
+        else:
+            parts.append(f"a [link {index}](/pages/{index}) here")
+    return " ".join(parts)
+
+
+def chained_text_to_textnodes(text:str) -> list[TextNode]:
+    """The five split_nodes_* passes chained over a node list, as text_to_textnodes used to run them."""
+    node_list = [TextNode(text, "text")]
+    node_list = split_nodes_delimiter(node_list, "**", "bold")
+    node_list = split_nodes_delimiter(node_list, "*", "italic")
+    node_list = split_nodes_delimiter(node_list, "`", "code")
+    node_list = split_nodes_image(node_list)
+    node_list = split_nodes_link(node_list)
+    return node_list
+
+
+def split_markdown_blocks(markdown:str) -> list[str]:
+    """The split/strip/filter chain markdown_to_blocks used before the block scanner."""
+    return list(filter(lambda block: block != "", map(lambda block: block.strip(), markdown.split("\n\n"))))
+
+
+def page_markdown(index:int, paragraphs:int, spans:int) -> str:
+    """Return a page exercising every block type with paragraphs of inline spans."""
+    blocks = [f"# Page {index}"]
+    for paragraph in range(paragraphs):
+        if paragraph % 4 == 1:
+            blocks.append("\n".join(f"- item {item} with *emphasis*" for item in range(5)))
+        elif paragraph % 4 == 2:
+            blocks.append("```\nfunc main(){\n    return\n}\n```")
+        elif paragraph % 4 == 3:
+            blocks.append(f"## Section {paragraph}\n\n> a quote with `code` in it")
+        else:
+            blocks.append(inline_paragraph(spans))
+    return "\n\n".join(blocks)
+
+
+def write_file(path:str, text:str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding="utf-8") as output:
+        output.write(text)
+
+
+def write_corpus(root:str, kind:str, scale:float) -> None:
+    """Write a synthetic site of the given kind under root (content, static, template.html)."""
+    count = lambda base: max(1, int(base * scale))
+    content = os.path.join(root, "content")
+    static = os.path.join(root, "static")
+    write_file(os.path.join(root, "template.html"), TEMPLATE)
+    write_file(os.path.join(static, "index.css"), "body { margin: 0; }")
+    if kind == "many-small":
+        for index in range(count(400)):
+            write_file(os.path.join(content, f"section{index % 20}", f"page{index}.md"), page_markdown(index, 4, 5))
+    elif kind == "few-huge":
+        for index in range(3):
+            write_file(os.path.join(content, f"huge{index}.md"), page_markdown(index, count(800), 10))
+    elif kind == "inline-dense":
+        for index in range(20):
+            write_file(os.path.join(content, f"dense{index}.md"), f"# Dense {index}\n\n{inline_paragraph(count(1000))}")
+    elif kind == "deep-nesting":
+        for branch in range(count(10)):
+            path = os.path.join(content, f"branch{branch}")
+            for depth in range(30):
+                path = os.path.join(path, f"level{depth}")
+                write_file(os.path.join(path, "index.md"), page_markdown(depth, 2, 3))
+    elif kind == "large-static":
+        for index in range(10):
+            write_file(os.path.join(content, f"page{index}.md"), page_markdown(index, 4, 5))
+        blob = "x" * 16384
+        for index in range(count(1000)):
+            write_file(os.path.join(static, f"dir{index % 25}", f"asset{index}.bin"), blob)
+    elif kind == "shared-fragments":
+        # the same notice and footer blocks on every page, as boilerplate would be.
+        shared = "\n\n".join([
+            "> **Note:** this page is *generated*, see [the guide](/guide) for details",
+            "\n".join(f"- [footer link {item}](/footer/{item}) with `code`" for item in range(8)),
+            inline_paragraph(20),
+        ])
+        for index in range(count(400)):
+            write_file(os.path.join(content, f"page{index}.md"), f"# Page {index}\n\n{inline_paragraph(5)} {index}\n\n{shared}")
+    else:
+        raise ValueError(f"Unknown corpus kind {kind}.")
+
+
+def read_pages(content:str) -> list[str]:
+    """Return the markdown of every page under content."""
+    pages = []
+    for dir_path, _, file_names in os.walk(content):
+        for file_name in sorted(file_names):
+            with open(os.path.join(dir_path, file_name), encoding="utf-8") as page:
+                pages.append(page.read())
+    return pages
+
+
+def full_build(root:str, *extra:str) -> None:
+    """Run a clean build of the corpus at root through main(), with extra command line options."""
+    with redirect_stdout(io.StringIO()):
+        build_main([*extra,
+            "--full",
+            "--content", os.path.join(root, "content"),
+            "--static", os.path.join(root, "static"),
+            "--template", os.path.join(root, "template.html"),
+            "--output", os.path.join(root, "public"),
+            "--cache-dir", os.path.join(root, ".cache"),
+        ])
+
+
+def template_rebuild(root:str) -> None:
+    """Touch the template of a built corpus and rebuild it incrementally."""
+    template = os.path.join(root, "template.html")
+    write_file(template, f"{TEMPLATE}<!-- {time.perf_counter_ns()} -->")
+    with redirect_stdout(io.StringIO()):
+        build_main([
+            "--content", os.path.join(root, "content"),
+            "--static", os.path.join(root, "static"),
+            "--template", template,
+            "--output", os.path.join(root, "public"),
+            "--cache-dir", os.path.join(root, ".cache"),
+        ])
+
+
+def bench_corpus(kind:str, scale:float, repeat:int) -> list[dict]:
+    """Time the pipeline stages on a freshly generated corpus of the given kind."""
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        write_corpus(root, kind, scale)
+        pages = read_pages(os.path.join(root, "content"))
+        trees = [markdown_to_html(page) for page in pages]
+        results.append({"name": f"markdown_to_html/{kind}", "seconds": best_of(lambda: [markdown_to_html(page) for page in pages], repeat=repeat)})
+        results.append({"name": f"to_html/{kind}", "seconds": best_of(lambda: [tree.to_html() for tree in trees], repeat=repeat)})
+        if kind == "inline-dense":
+            paragraphs = [page.split("\n\n", 1)[1] for page in pages]
+            results.append({"name": f"text_to_textnodes/{kind}", "seconds": best_of(lambda: [text_to_textnodes(text) for text in paragraphs], repeat=repeat)})
+        if kind == "large-static":
+            static = os.path.join(root, "static")
+            copy_dest = os.path.join(root, "copy")
+            with redirect_stdout(io.StringIO()):
+                results.append({"name": f"copy_files/{kind}", "seconds": best_of(copy_files, static, copy_dest, repeat=repeat)})
+            manifest = BuildManifest(os.path.join(root, "sync-manifest.json"))
+            sync_dest = os.path.join(root, "sync")
+            sync_files(static, sync_dest, manifest)
+            results.append({"name": f"sync_files_unchanged/{kind}", "seconds": best_of(sync_files, static, sync_dest, manifest, repeat=repeat)})
+        if kind == "shared-fragments":
+            results.append({"name": f"build_uncached/{kind}", "seconds": best_of(full_build, root, "--block-cache-mb", "0", repeat=repeat)})
+        results.append({"name": f"build/{kind}", "seconds": best_of(full_build, root, repeat=repeat)})
+        if kind == "many-small":
+            results.append({"name": f"template_rebuild/{kind}", "seconds": best_of(template_rebuild, root, repeat=repeat)})
+    return results
+
+
+def build_nodes(count:int) -> list:
+    """Build count text nodes, their leaf nodes and a parent per ten leaves, as markdown_to_html does."""
+    text_nodes = [TextNode(f"span {index}", "bold" if index % 2 else "text") for index in range(count)]
+    leaves = [text_node_to_html_node(node) for node in text_nodes]
+    parents = [ParentNode("p", leaves[index:index + 10]) for index in range(0, count, 10)]
+    return [text_nodes, leaves, parents]
+
+
+def bench_nodes(count:int, repeat:int) -> list[dict]:
+    """Time node construction and measure the memory held by the nodes."""
+    results = [
+        {"name": f"TextNode/{count}", "seconds": best_of(lambda: [TextNode("span", "bold", None) for _ in range(count)], repeat=repeat)},
+        {"name": f"LeafNode/{count}", "seconds": best_of(lambda: [LeafNode("b", "span") for _ in range(count)], repeat=repeat)},
+    ]
+    tracemalloc.start()
+    nodes = build_nodes(count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    results.append({"name": f"node_memory/{count}", "seconds": best_of(build_nodes, count, repeat=repeat), "bytes": memory})
+    return results
+
+
+def bench_inline(sizes:list[int], repeat:int) -> list[dict]:
+    """Time text_to_textnodes against the chained split passes."""
+    results = []
+    for size in sizes:
+        text = inline_paragraph(size)
+        results.append({"name": f"text_to_textnodes/{size}-spans", "seconds": best_of(text_to_textnodes, text, repeat=repeat)})
+        try:
+            chained = best_of(chained_text_to_textnodes, text, repeat=repeat)
+        except RecursionError:
+            chained = None
+        results.append({"name": f"chained_split_nodes/{size}-spans", "seconds": chained})
+    return results
+
+
+def bench_blocks(pages:int, repeat:int) -> list[dict]:
+    """Time markdown_to_blocks against the split chain on one large document."""
+    markdown = "\n\n".join(page_markdown(index, 8, 5) for index in range(pages))
+    size = f"{len(markdown) // 1024}KiB"
+    return [
+        {"name": f"markdown_to_blocks/{size}", "seconds": best_of(markdown_to_blocks, markdown, repeat=repeat)},
+        {"name": f"split_markdown_blocks/{size}", "seconds": best_of(split_markdown_blocks, markdown, repeat=repeat)},
+    ]
+
+
+def tree_to_html(markdown:str) -> str:
+    return markdown_to_html(markdown).to_html()
+
+
+def bench_render(pages:int, repeat:int) -> list[dict]:
+    """Time rendering one large document through the node tree and directly."""
+    markdown = "\n\n".join(page_markdown(index, 8, 5) for index in range(pages))
+    size = f"{len(markdown) // 1024}KiB"
+    return [
+        {"name": f"render_tree/{size}", "seconds": best_of(tree_to_html, markdown, repeat=repeat)},
+        {"name": f"render_direct/{size}", "seconds": best_of(markdown_to_html_string, markdown, repeat=repeat)},
+    ]
+
+
+def current_commit() -> str|None:
+    """Return the current git commit, if any."""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def load_history(path:str) -> list[dict]:
+    """Return the stored benchmark runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as history:
+        return [json.loads(line) for line in history if line.strip() != ""]
+
+
+def store_results(path:str, results:list[dict], scale:float) -> None:
+    """Append a run to the JSON-lines history at path."""
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    record = {
+        "commit": current_commit(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "scale": scale,
+        "results": results,
+    }
+    with open(path, 'a', encoding="utf-8") as history:
+        history.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def previous_timings(history:list[dict], scale:float) -> dict[str, float]:
+    """Return the latest stored timing of each benchmark run at the same scale."""
+    timings = {}
+    for record in history:
+        if record.get("scale") != scale:
+            continue
+        for result in record["results"]:
+            timings[result["name"]] = result["seconds"]
+    return timings
+
+
+def print_results(results:list[dict], baseline:dict[str, float]|None=None) -> None:
+    """Print results in milliseconds, with the change against baseline when known."""
+    for result in results:
+        seconds = result["seconds"]
+        if seconds is None:
+            print(f"{result['name']:<40} {'RecursionError':>12}")
+            continue
+        line = f"{result['name']:<40} {seconds * 1000:>10.2f}ms"
+        if "bytes" in result:
+            line += f" {result['bytes'] / 1024:>10.0f}KiB"
+        previous = None if baseline is None else baseline.get(result["name"])
+        if previous:
+            line += f" {(seconds - previous) / previous * 100:>+8.1f}%"
+        print(line)
+
+
+def main(argv:list[str]|None=None) -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the markdown pipeline.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the fastest is kept")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the size of the synthetic corpora")
+    parser.add_argument("--only", help="only run benchmarks whose corpus or name contains this")
+    parser.add_argument("--results", default=RESULTS, help="JSON-lines history of benchmark runs")
+    parser.add_argument("--no-store", action="store_true", help="do not append this run to the history")
+    args = parser.parse_args(argv)
+
+    baseline = previous_timings(load_history(args.results), args.scale)
+    results = []
+    if args.only is None or args.only in "inline":
+        results.extend(bench_inline([10, 100, 500, 5000], args.repeat))
+    if args.only is None or args.only in "blocks":
+        results.extend(bench_blocks(max(10, int(5000 * args.scale)), args.repeat))
+    if args.only is None or args.only in "render":
+        results.extend(bench_render(max(10, int(500 * args.scale)), args.repeat))
+    if args.only is None or args.only in "nodes":
+        results.extend(bench_nodes(max(10, int(100000 * args.scale)), args.repeat))
+    for kind in CORPUS_KINDS:
+        if args.only is None or args.only in kind:
+            results.extend(bench_corpus(kind, args.scale, args.repeat))
+    print_results(results, baseline)
+    if not args.no_store:
+        store_results(args.results, results, args.scale)
+
+
+if __name__ == "__main__":
+    main()
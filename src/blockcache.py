@@ -0,0 +1,84 @@
+"""Bounded LRU cache of rendered block HTML."""
+from collections import OrderedDict
+from typing import Callable
+import sys
+
+
+def entry_size(block:str, html:str) -> int:
+    """Approximate memory held by one cache entry, in bytes."""
+    return sys.getsizeof(block) + sys.getsizeof(html)
+
+
+class BlockCache():
+    """Maps the markdown of a block to its rendered HTML, evicting the least recently used past max_bytes."""
+    enabled = True
+
+    def __init__(self, max_bytes:int) -> None:
+        self.max_bytes = max_bytes
+        # keyed by the block text itself, so lookups go through its (cached) str hash
+        # and a hash collision can never return another block's HTML.
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, block:str, render:Callable[[str], str]) -> str:
+        """Return the HTML of block, calling render(block) only on a miss."""
+        html = self.entries.get(block)
+        if html is not None:
+            self.entries.move_to_end(block)
+            self.hits += 1
+            return html
+        self.misses += 1
+        html = render(block)
+        size = entry_size(block, html)
+        if size > self.max_bytes:
+            return html
+        self.entries[block] = html
+        self.size += size
+        while self.size > self.max_bytes:
+            old_block, old_html = self.entries.popitem(last=False)
+            self.size -= entry_size(old_block, old_html)
+        return html
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. when the way blocks render has changed."""
+        self.entries.clear()
+        self.size = 0
+
+
+class NullBlockCache():
+    """Block cache used when caching is off; every block is rendered."""
+    enabled = False
+    max_bytes = 0
+    hits = 0
+    misses = 0
+
+    def render(self, block:str, render:Callable[[str], str]) -> str:
+        return render(block)
+
+    def clear(self) -> None:
+        pass
+
+
+def create_block_cache(max_bytes:int) -> BlockCache|NullBlockCache:
+    """Return a cache bounded to max_bytes, or a null cache when max_bytes is 0."""
+    if max_bytes <= 0:
+        return NullBlockCache()
+    return BlockCache(max_bytes)
+
+
+_block_cache = NullBlockCache()
+
+
+def get_block_cache() -> BlockCache|NullBlockCache:
+    """Return the block cache of the current process."""
+    return _block_cache
+
+
+def set_block_cache(block_cache:BlockCache|NullBlockCache) -> BlockCache|NullBlockCache:
+    """Install block_cache for the current process, returning the previous one."""
+    global _block_cache
+    previous = _block_cache
+    _block_cache = block_cache
+    return previous
@@ -0,0 +1,73 @@
+"""Levelled build logging with an optional JSON-lines event log."""
+import json
+import sys
+import time
+
+QUIET = 0
+SUMMARY = 1
+VERBOSE = 2
+
+
+class BuildLog():
+    """Counts build events, prints according to level and optionally records events as JSON lines."""
+
+    def __init__(self, level:int=SUMMARY, events_path:str|None=None, stream=None) -> None:
+        self.level = level
+        self.stream = stream
+        self.counts = {}
+        self.started = time.perf_counter()
+        self.events = None
+        if events_path is not None:
+            self.events = open(events_path, 'a', encoding="utf-8")
+
+    def write(self, message:str) -> None:
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(message + "\n")
+
+    def info(self, message:str) -> None:
+        """Per-file detail, only printed when verbose."""
+        if self.level >= VERBOSE:
+            self.write(message)
+
+    def summary(self, message:str) -> None:
+        """Printed unless quiet."""
+        if self.level >= SUMMARY:
+            self.write(message)
+
+    def error(self, message:str) -> None:
+        """Always printed, to stderr."""
+        sys.stderr.write(message + "\n")
+
+    def event(self, name:str, count:int=1, **fields) -> None:
+        """Count an event and record it in the event log if there is one."""
+        self.counts[name] = self.counts.get(name, 0) + count
+        if self.events is not None:
+            record = {"event": name, "time": round(time.perf_counter() - self.started, 6)}
+            if count != 1:
+                record["count"] = count
+            record.update(fields)
+            self.events.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def close(self) -> None:
+        if self.events is not None:
+            self.events.close()
+            self.events = None
+
+
+_log = BuildLog()
+
+
+def get_log() -> BuildLog:
+    """Return the build log of the current process."""
+    return _log
+
+
+def set_log(log:BuildLog) -> BuildLog:
+    """Install log for the current process, returning the previous one."""
+    global _log
+    previous = _log
+    _log = log
+    return previous
@@ -0,0 +1,89 @@
+"""Sitemap and Atom feed of the built pages, written as streams of XML chunks."""
+from htmlnode import escape_attribute
+from sections import page_url
+from typing import Iterator
+import hashlib
+import heapq
+import os
+
+# most URLs a single sitemap file may list.
+SITEMAP_LIMIT = 50000
+FEED_ENTRIES = 20
+SITEMAP = "sitemap.xml"
+FEED = "feed.xml"
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def absolute_url(base_url:str, path:str) -> str:
+    """Join a site path onto the base URL."""
+    return base_url.rstrip("/") + path
+
+
+def page_date(meta:dict) -> str|None:
+    """Return the front matter date of a page as a string, if it has one."""
+    date = meta.get("front_matter", {}).get("date")
+    return None if date is None else str(date)
+
+
+def atom_date(date:str) -> str:
+    """Return a front matter date as an RFC 3339 timestamp, midnight UTC for plain dates."""
+    return date if "T" in date else f"{date}T00:00:00Z"
+
+
+def iter_sitemap(entries:list[tuple[str, str|None]]) -> Iterator[str]:
+    """Yield a sitemap of (url, lastmod) entries chunk by chunk."""
+    yield XML_DECLARATION
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+    for url, lastmod in entries:
+        lastmod_xml = "" if lastmod is None else f"<lastmod>{escape_attribute(lastmod)}</lastmod>"
+        yield f"<url><loc>{escape_attribute(url)}</loc>{lastmod_xml}</url>\n"
+    yield "</urlset>\n"
+
+
+def iter_sitemap_index(urls:list[str]) -> Iterator[str]:
+    """Yield a sitemap index pointing at the shard URLs."""
+    yield XML_DECLARATION
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for url in urls:
+        yield f"<sitemap><loc>{escape_attribute(url)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def iter_atom_feed(title:str, feed_url:str, site_url:str, entries:list[tuple[str, str, str]]) -> Iterator[str]:
+    """Yield an Atom feed of (url, title, date) entries, newest first."""
+    yield XML_DECLARATION
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f"<title>{escape_attribute(title)}</title>\n"
+    yield f'<link href="{escape_attribute(site_url)}"/>\n'
+    yield f'<link rel="self" href="{escape_attribute(feed_url)}"/>\n'
+    yield f"<id>{escape_attribute(feed_url)}</id>\n"
+    yield f"<updated>{escape_attribute(atom_date(entries[0][2]))}</updated>\n"
+    for url, entry_title, date in entries:
+        yield (f'<entry><title>{escape_attribute(entry_title)}</title><link href="{escape_attribute(url)}"/>'
+               f"<id>{escape_attribute(url)}</id><updated>{escape_attribute(atom_date(date))}</updated></entry>\n")
+    yield "</feed>\n"
+
+
+def sitemap_outputs(output_dir:str, count:int, limit:int=SITEMAP_LIMIT) -> list[str]:
+    """Return the sitemap files for count URLs: one sitemap, or an index followed by its shards."""
+    if count <= limit:
+        return [os.path.join(output_dir, SITEMAP)]
+    shards = (count + limit - 1) // limit
+    return [os.path.join(output_dir, SITEMAP)] + [os.path.join(output_dir, f"sitemap-{number}.xml") for number in range(1, shards + 1)]
+
+
+def newest_entries(index:dict[str, dict], output_dir:str, base_url:str) -> list[tuple[str, str, str]]:
+    """Return (url, title, date) of the FEED_ENTRIES most recently dated pages, newest first."""
+    dated = ((meta, page_date(meta)) for meta in index.values())
+    newest = heapq.nlargest(FEED_ENTRIES, ((meta, date) for meta, date in dated if date is not None), key=lambda item: item[1])
+    return [(absolute_url(base_url, page_url(meta["output"], output_dir)), meta["title"], date) for meta, date in newest]
+
+
+def feeds_fingerprint(base_url:str, index:dict[str, dict], limit:int=SITEMAP_LIMIT) -> str:
+    """Hash the URL, title and date of every page, which is all the sitemap and feed are made of."""
+    hasher = hashlib.sha256(f"{base_url}\n{limit}\n{FEED_ENTRIES}\n".encode())
+    for meta in index.values():
+        hasher.update(f'{meta["output"]}\0{meta["title"]}\0{page_date(meta)}\n'.encode())
+    return hasher.hexdigest()
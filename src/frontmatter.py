@@ -0,0 +1,76 @@
+"""Front matter at the top of markdown pages."""
+from typing import Iterable
+import json
+import re
+
+# opening and closing line of a front matter block -> separator of its key/value lines.
+FENCES = {"---": ":", "+++": "="}
+
+LIST_ITEM_RE = re.compile(r"\s*(\"(?:[^\"\\]|\\.)*\"|'[^']*'|[^,]+)")
+INT_RE = re.compile(r"-?\d+")
+
+
+def parse_value(value:str) -> str|int|bool|list:
+    """Parse a scalar or a flat [a, "b"] list; anything else is a bare string."""
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in LIST_ITEM_RE.findall(value[1:-1]) if item.strip() != ""]
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return json.loads(value)
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if INT_RE.fullmatch(value):
+        return int(value)
+    return value
+
+
+def parse_front_matter(lines:Iterable[str], separator:str) -> dict:
+    """Parse "key: value" (YAML style) or "key = value" (TOML style) lines into a dict."""
+    front_matter = {}
+    for line in lines:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        key, found, value = line.partition(separator)
+        if not found or key.strip() == "":
+            raise ValueError(f"Invalid front matter line: {line!r}")
+        try:
+            front_matter[key.strip()] = parse_value(value)
+        except ValueError:
+            raise ValueError(f"Invalid front matter value: {line!r}")
+    return front_matter
+
+
+def split_front_matter(text:str) -> tuple[dict, str]:
+    """Return (front matter, body) of a page; pages without front matter have an empty dict."""
+    first, _, rest = text.partition("\n")
+    fence = first.rstrip()
+    separator = FENCES.get(fence)
+    if separator is None:
+        return {}, text
+    close = re.search(rf"^{re.escape(fence)}[ \t\r]*$", rest, re.MULTILINE)
+    if close is None:
+        raise ValueError("Unclosed front matter.")
+    return parse_front_matter(rest[:close.start()].splitlines(), separator), rest[close.end():]
+
+
+def read_front_matter(path:str) -> dict:
+    """Read only the front matter of the page at path, stopping at its closing fence."""
+    with open(path, 'r', encoding="utf-8") as page_file:
+        fence = page_file.readline().rstrip()
+        separator = FENCES.get(fence)
+        if separator is None:
+            return {}
+        lines = []
+        for line in page_file:
+            if line.rstrip() == fence:
+                return parse_front_matter(lines, separator)
+            lines.append(line)
+    raise ValueError("Unclosed front matter.")
+
+
+def is_draft(front_matter:dict) -> bool:
+    """True if the front matter marks the page as a draft."""
+    return front_matter.get("draft") is True
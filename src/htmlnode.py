@@ -1,24 +1,45 @@
 """HTML Node class"""
+from html import escape
+
+
+def escape_attribute(value) -> str:
+    """Escape a value for use inside a double quoted HTML attribute."""
+    return escape(str(value), quote=True)
+
 
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props", "_props_key", "_props_html")
 
     def __init__(self, tag:str|None=None, value:str|None=None, children:list|None=None, props:dict|None=None) -> None:
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+        self._props_key = None
+        self._props_html = ""
 
     def to_html(self):
         raise NotImplementedError
+
+    def iter_html(self):
+        """Yield the HTML in chunks without building the whole string."""
+        raise NotImplementedError
+
+    def write(self, fp) -> None:
+        """Stream the HTML to a writable text file object."""
+        fp.writelines(self.iter_html())
     
-    def props_to_html(self):
-        prop_str = ""
-        if isinstance(self.props, dict):
-            for key in self.props:
-                prop_str+=f'{key}="{self.props[key]}" '
-            if prop_str != "":
-                prop_str = prop_str[:-1]
-        return prop_str
+    def props_to_html(self) -> str:
+        """Return the escaped attributes, rendered once and cached until props change."""
+        if self.props is None:
+            return ""
+        # props may be mutated in place, so the cache is keyed on a snapshot of the rendered values:
+        # the values themselves compare 1, True and 1.0 equal and may be mutated in place too.
+        key = tuple([(name, str(value)) for name, value in self.props.items()])
+        if key != self._props_key:
+            self._props_html = " ".join([f'{name}="{escape_attribute(value)}"' for name, value in key])
+            self._props_key = key
+        return self._props_html
     
     def __repr__(self) -> str:
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
@@ -26,6 +47,8 @@ class HTMLNode():
 
 class LeafNode(HTMLNode):
     """Leaf Nodes."""
+    __slots__ = ()
+
     def __init__(self, tag: str|None, value: str, props: dict | None = None) -> None:
         super().__init__(tag, value, None, props)
 
@@ -34,15 +57,21 @@ class LeafNode(HTMLNode):
             raise ValueError("Value has not been set.")
         if self.tag is None:
             return self.value
-        if self.props_to_html() != "":
-            return f"<{self.tag} {self.props_to_html()}>{self.value}</{self.tag}>"
+        props = self.props_to_html()
+        if props != "":
+            return f"<{self.tag} {props}>{self.value}</{self.tag}>"
         return f"<{self.tag}>{self.value}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
     
     def __repr__(self) -> str:
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
     
 class ParentNode(HTMLNode):
     """Parent Nodes."""
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict | None = None) -> None:
         super().__init__(tag, None, children, props)
 
@@ -53,10 +82,26 @@ class ParentNode(HTMLNode):
             raise ValueError("Expected Children.")
         
         child_html = list(map(lambda x: x.to_html(), self.children))
-        if self.props_to_html() != "":
-            return f"<{self.tag} {self.props_to_html()}>{''.join(child_html)}</{self.tag}>"
+        props = self.props_to_html()
+        if props != "":
+            return f"<{self.tag} {props}>{''.join(child_html)}</{self.tag}>"
         return f"<{self.tag}>{''.join(child_html)}</{self.tag}>"
 
+    def iter_html(self):
+        if self.tag is None:
+            raise ValueError("Tag has not been set.")
+        if self.children is None or len(self.children)==0:
+            raise ValueError("Expected Children.")
+
+        props = self.props_to_html()
+        if props != "":
+            yield f"<{self.tag} {props}>"
+        else:
+            yield f"<{self.tag}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
     def __repr__(self) -> str:
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
     
\ No newline at end of file
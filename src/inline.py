@@ -0,0 +1,126 @@
+"""Inline markdown tokenizer."""
+from htmlnode import LeafNode
+from textnode import TextNode, TextType, register_text_type, text_to_html
+from typing import Callable, Iterator
+import re
+
+# delimiter -> text type of the span it encloses.
+DELIMITERS = {"**": TextType.BOLD, "*": TextType.ITALIC, "`": TextType.CODE}
+
+# text type -> (opening, closing) markdown syntax.
+INLINE_SYNTAX = {
+    TextType.TEXT: ("", ""),
+    TextType.BOLD: ("**", "**"),
+    TextType.ITALIC: ("*", "*"),
+    TextType.CODE: ("`", "`"),
+    TextType.LINK: ("[", "]"),
+    TextType.IMAGE: ("![", "]"),
+}
+
+IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_RE = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+
+# (pattern, opening, text type) of the passes that run after the delimiter passes.
+PATTERN_PASSES = ((IMAGE_RE, "![", TextType.IMAGE), (LINK_RE, "[", TextType.LINK))
+
+Token = tuple[TextType, str, str|None]
+
+# the plain string: TextType attribute lookups and enum hashing are slow in the per-node loops.
+TEXT = TextType.TEXT.value
+
+
+def register_inline_type(text_type:str, delimiter:str, renderer:Callable[[TextNode], LeafNode]) -> None:
+    """Register a delimited inline type, e.g. ("strikethrough", "~~", ...), with the tokenizer and renderer.
+
+    Its pass runs after the built-in delimiter passes and before images and links.
+    """
+    DELIMITERS[delimiter] = text_type
+    INLINE_SYNTAX[text_type] = (delimiter, delimiter)
+    register_text_type(text_type, renderer)
+
+
+def find_opening(text:str, delimiter:str, position:int) -> int:
+    """Find the next opening delimiter from position, skipping doubled pairs that are delimiters of their own."""
+    start = text.find(delimiter, position)
+    doubled = delimiter * 2
+    if doubled not in DELIMITERS:
+        return start
+    while start != -1 and text.startswith(doubled, start):
+        # found e.g. bold, not italic: skip past its closing pair.
+        doubled_end = text.find(doubled, start + 2)
+        if doubled_end == -1:
+            return -1
+        start = text.find(delimiter, doubled_end + 2)
+    return start
+
+
+def split_delimiter(nodes:list[TextNode], delimiter:str, text_type:TextType) -> list[TextNode]:
+    """Split the text nodes around every delimiter pair, keeping nodes without one as they are."""
+    split = []
+    size = len(delimiter)
+    text_type = str(text_type)
+    for node in nodes:
+        if node.text_type != TEXT or delimiter not in node.text:
+            split.append(node)
+            continue
+        text = node.text
+        position = 0
+        # walk the text once, emitting the text before each span and the span itself.
+        while True:
+            start = find_opening(text, delimiter, position)
+            if start == -1:
+                split.append(node if position == 0 else TextNode(text[position:], TEXT))
+                break
+            end = text.find(delimiter, start + size)
+            if end == -1:
+                raise Exception("Closing Syntax not found. Invalid Markdown")
+            split.append(TextNode(text[position:start], TEXT))
+            split.append(TextNode(text[start + size:end], text_type))
+            position = end + size
+    return split
+
+
+def split_pattern(nodes:list[TextNode], pattern:re.Pattern, opening:str, text_type:TextType) -> list[TextNode]:
+    """Split the text nodes around every (text, url) match of pattern, keeping nodes without one as they are."""
+    split = []
+    text_type = str(text_type)
+    for node in nodes:
+        if node.text_type != TEXT or opening not in node.text:
+            split.append(node)
+            continue
+        text = node.text
+        position = 0
+        for match in pattern.finditer(text):
+            split.append(TextNode(text[position:match.start()], TEXT))
+            split.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+        if position == 0:
+            split.append(node)
+        elif position < len(text):
+            split.append(TextNode(text[position:], TEXT))
+    return split
+
+
+def tokenize_inline(text:str) -> list[TextNode]:
+    """Split inline markdown into TextNodes.
+
+    Runs one pass per delimiter, then the image and link passes, over the
+    node list: each pass only splits the text left over by the earlier
+    ones, so a link never spans a code or image span.
+    """
+    nodes = [TextNode(text, TEXT)]
+    for delimiter, text_type in DELIMITERS.items():
+        nodes = split_delimiter(nodes, delimiter, text_type)
+    for pattern, opening, text_type in PATTERN_PASSES:
+        nodes = split_pattern(nodes, pattern, opening, text_type)
+    return nodes
+
+
+def iter_inline(text:str) -> Iterator[Token]:
+    """Yield (text_type, text, url) tokens for a block of inline markdown."""
+    return ((node.text_type, node.text, node.url) for node in tokenize_inline(text))
+
+
+def inline_to_html(text:str) -> str:
+    """Render inline markdown straight to HTML without building an HTML node tree."""
+    return "".join([text_to_html(node.text_type, node.text, node.url) for node in tokenize_inline(text)])
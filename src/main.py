@@ -1,9 +1,30 @@
 """Entry point for main."""
 from textnode import TextNode, text_node_to_html_node
-from htmlnode import ParentNode
+from htmlnode import LeafNode, ParentNode
+from manifest import BuildManifest, hash_file
+from assets import ASSET_MANIFEST, LINK_MODES, asset_urls, asset_urls_digest, get_asset_urls, set_asset_urls, sync_files
+from template import load_template
+from frontmatter import is_draft, read_front_matter, split_front_matter
+from feeds import FEED, SITEMAP_LIMIT, absolute_url, feeds_fingerprint, iter_atom_feed, iter_sitemap, iter_sitemap_index, newest_entries, page_date, sitemap_outputs
+from sections import LIST_TEMPLATE, page_url, group_sections, iter_entries_html, listing_output, pagination_html, section_fingerprint
+from inline import IMAGE_RE, INLINE_SYNTAX, LINK_RE, inline_to_html, split_delimiter, split_pattern, tokenize_inline
+from watch import watch_and_serve
+from profiler import BuildProfiler, get_profiler, set_profiler
+from parsecache import ParseCache
+from blockcache import BlockCache, create_block_cache, get_block_cache, set_block_cache
+from buildlog import BuildLog, get_log, set_log, QUIET, SUMMARY, VERBOSE
+from concurrent.futures import ProcessPoolExecutor
+from operator import length_hint
+from typing import Callable, Iterable, Iterator
+import argparse
 import re
 import os
 import shutil
+import time
+
+RENDERERS = ("tree", "direct")
+# a template in a content directory applies to the pages below it.
+DIRECTORY_TEMPLATE = "_template.html"
 
 text_type_text = ("text", "")
 text_type_bold = ("bold", "**")
@@ -12,348 +33,994 @@ text_type_code = ("code", "`")
 text_type_link = ("link", "[", "]")
 text_type_image = ("image", "![", "]")
 
-def main() -> None:
+def parse_args(argv:list[str]|None=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("command", nargs="?", choices=("build", "watch", "why-rebuilt"), default="build", help="build once, rebuild on change and serve the output, or explain why a page was rebuilt")
+    parser.add_argument("target", nargs="?", help="page source or output, or a template, for why-rebuilt")
+    parser.add_argument("--content", default="./content", help="markdown source directory")
+    parser.add_argument("--static", default="./static", help="static asset directory")
+    parser.add_argument("--template", default="./template.html", help="default page template, overridden by the nearest _template.html in a content directory")
+    parser.add_argument("--partials", default="./partials", help="directory of the partials templates include with {{> name }}")
+    parser.add_argument("--output", default="./public", help="output directory")
+    parser.add_argument("--cache-dir", default="./.cache", help="directory for the build manifest and caches")
+    parser.add_argument("--full", action="store_true", help="ignore the build manifest and rebuild everything")
+    parser.add_argument("--drafts", action="store_true", help="also build pages marked draft in their front matter")
+    parser.add_argument("--link", choices=LINK_MODES, default="copy", help="how to place static assets in the output")
+    parser.add_argument("--checksum", action="store_true", help="compare static assets by content hash instead of size and mtime")
+    parser.add_argument("--fingerprint", action="store_true", help="place static assets as name.<content hash>.ext, except HTML, robots.txt, favicon.ico and dotfiles, and rewrite root-absolute (/...) references to them; relative URLs and CSS url() are left as is")
+    parser.add_argument("--renderer", choices=RENDERERS, default="tree", help="build pages through the HTML node tree, or render markdown straight to HTML")
+    parser.add_argument("--block-cache-mb", type=float, default=32, help="memory for caching the HTML of repeated blocks, 0 to disable")
+    parser.add_argument("--per-page", type=int, default=20, help=f"entries per listing page of a section with a {LIST_TEMPLATE}")
+    parser.add_argument("--base-url", help="absolute URL the site is served from, required to write sitemap.xml and the Atom feed")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes, 0 for one per CPU")
+    parser.add_argument("--profile", action="store_true", help="print wall and CPU time per build stage and the slowest pages")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the profile as JSON to PATH")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--quiet", "-q", action="store_true", help="only print errors")
+    verbosity.add_argument("--verbose", "-v", action="store_true", help="print a line per file")
+    parser.add_argument("--log-json", metavar="PATH", help="append a JSON-lines event log to PATH")
+    parser.add_argument("--port", type=int, default=8888, help="port the watch server listens on")
+    args = parser.parse_args(argv)
+    if (args.command == "why-rebuilt") != (args.target is not None):
+        parser.error("a target is required by why-rebuilt and only accepted by it")
+    if args.per_page < 1:
+        parser.error("--per-page must be at least 1")
+    return args
+
+def main(argv:list[str]|None=None) -> None:
     """main func."""
-    copy_files("./static", "./public")
-    generate_pages_recursive("./content", "./template.html", "./public")
+    args = parse_args(argv)
+    level = QUIET if args.quiet else VERBOSE if args.verbose else SUMMARY
+    set_log(BuildLog(level, args.log_json))
+    if args.profile or args.profile_json is not None:
+        set_profiler(BuildProfiler())
+    set_block_cache(create_block_cache(int(args.block_cache_mb * 1024 * 1024)))
+    if args.command == "why-rebuilt":
+        print(why_rebuilt(args))
+        get_log().close()
+        return
+    if args.command == "watch":
+        build(args)
+        args.full = False
+        roots = [args.content, args.static, args.template, args.partials]
+        watch_and_serve(roots, lambda changed: rebuild_changed(changed, args), args.output, args.port)
+        get_log().close()
+        return
+    build(args)
+    profiler = get_profiler()
+    if profiler.enabled:
+        get_log().summary(profiler.report())
+        if args.profile_json is not None:
+            profiler.write_json(args.profile_json)
+    get_log().close()
+
+def build(args:argparse.Namespace) -> None:
+    """Build the site incrementally against the previous build's manifest."""
+    log = get_log()
+    log.counts.clear()
+    start = time.perf_counter()
+    manifest = BuildManifest(os.path.join(args.cache_dir, "manifest.json"))
+    if args.full:
+        manifest.reset()
+    if manifest.is_empty() and os.path.exists(args.output):
+        log.info(f"No previous build, cleaning {args.output}")
+        shutil.rmtree(args.output)
+    profiler = get_profiler()
+    with profiler.stage("asset copy"):
+        stats = sync_files(args.static, args.output, manifest, args.link, args.checksum, args.fingerprint)
+    log.event("assets_synced", **stats)
+    set_asset_urls(asset_urls(manifest))
+    parse_cache = ParseCache(os.path.join(args.cache_dir, "pages"), asset_urls_digest())
+    if args.full:
+        parse_cache.clear()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    generate_pages_recursive(args.content, args.template, args.output, manifest, jobs, args.renderer, parse_cache, args.partials, args.drafts)
+    remove_stale_pages(manifest)
+    with profiler.stage("listings"):
+        listings = generate_sections(manifest, args.content, args.output, args.per_page, args.partials)
+    with profiler.stage("sitemap and feed"):
+        generate_feeds(manifest, args.output, args.base_url)
+    parse_cache.prune({entry["hash"] for entry in manifest.pages.values()})
+    manifest.save()
+    counts = log.counts
+    elapsed = time.perf_counter() - start
+    log.event("build_finished", seconds=round(elapsed, 6))
+    block_cache = ""
+    if get_block_cache().enabled:
+        block_cache = f"; block cache {counts.get('block_cache_hit', 0)} hit(s), {counts.get('block_cache_miss', 0)} miss(es)"
+    if counts.get("parse_cache_hit", 0) > 0:
+        block_cache += f"; {counts['parse_cache_hit']} page(s) from parse cache"
+    if listings["generated"] + listings["removed"] > 0:
+        block_cache += f"; listings {listings['generated']} written, {listings['removed']} removed"
+    log.summary(
+        f"Built {counts.get('page_generated', 0)} page(s), {counts.get('page_unchanged', 0)} unchanged, "
+        f"{counts.get('page_removed', 0)} removed; assets {stats['copied']} copied, {stats['unchanged']} unchanged, "
+        f"{stats['removed']} removed{block_cache} in {elapsed:.2f} s"
+    )
+
+def rebuild_changed(changed:set[str], args:argparse.Namespace) -> str:
+    """Rebuild only what the changed paths affect, returning a summary."""
+    manifest = BuildManifest(os.path.join(args.cache_dir, "manifest.json"))
+    content_root = os.path.abspath(args.content)
+    if manifest.is_empty() or content_root in changed:
+        build(args)
+        return "Rebuilt site"
+
+    log = get_log()
+    generated = log.counts.get("page_generated", 0)
+    summary = []
+    static_root = os.path.abspath(args.static)
+    if any(is_within(path, static_root) for path in changed):
+        stats = sync_files(args.static, args.output, manifest, args.link, args.checksum, args.fingerprint)
+        summary.append(f"{stats['copied'] + stats['removed']} asset(s)")
+
+    partials_root = os.path.abspath(args.partials)
+    templates_changed = os.path.abspath(args.template) in changed or any(is_within(path, partials_root) for path in changed)
+    urls = asset_urls(manifest)
+    if urls != get_asset_urls():
+        # every page and template was rendered with the old asset URLs.
+        set_asset_urls(urls)
+        templates_changed = True
+    pages = {}
+    removed = 0
+    for path in sorted(changed):
+        if not is_within(path, content_root):
+            continue
+        rel_path = os.path.relpath(path, content_root)
+        if any(part.startswith("_") for part in rel_path.split(os.sep)):
+            # directory templates and other _ files are not pages.
+            templates_changed = True
+            continue
+        from_path = os.path.join(args.content, rel_path)
+        if os.path.isfile(path):
+            pages[from_path] = page_dest_path(from_path, args.content, args.output)
+        elif os.path.isdir(path):
+            # a created or moved-in directory only reports itself.
+            pages.update(discover_pages(from_path, os.path.join(args.output, rel_path)))
+        else:
+            # deleted file or directory: drop every page recorded under it.
+            for source in [source for source in manifest.pages if is_within(os.path.abspath(source), path)]:
+                output = manifest.forget(source)
+                if os.path.exists(output):
+                    os.remove(output)
+                removed += 1
+    if templates_changed:
+        # the manifest knows which pages used the changed templates; only those are stale.
+        pages.update(discover_pages(args.content, args.output))
+    parse_cache = ParseCache(os.path.join(args.cache_dir, "pages"), asset_urls_digest())
+    generate_pages(sorted(pages.items()), args.template, manifest, renderer=args.renderer, parse_cache=parse_cache,
+                   content_dir=args.content, partials_dir=args.partials, drafts=args.drafts)
+    generated = log.counts.get("page_generated", 0) - generated
+    listings = generate_sections(manifest, args.content, args.output, args.per_page, args.partials)
+    generate_feeds(manifest, args.output, args.base_url)
+    if generated > 0 or len(summary) == 0:
+        summary.append(f"{generated} page(s)")
+    if listings["generated"] > 0:
+        summary.append(f"{listings['generated']} listing page(s)")
+    if removed > 0:
+        summary.append(f"removed {removed} page(s)")
+    manifest.save()
+    return f"Rebuilt {', '.join(summary)}"
+
+
+def why_rebuilt(args:argparse.Namespace) -> str:
+    """Explain why the target page was last rebuilt and whether the next build would rebuild it.
+
+    A template or partial as target lists the pages that depend on it.
+    """
+    manifest = BuildManifest(os.path.join(args.cache_dir, "manifest.json"))
+    set_asset_urls(asset_urls(manifest))
+    target = os.path.abspath(args.target)
+    for source, entry in sorted(manifest.pages.items()):
+        if target not in (os.path.abspath(source), os.path.abspath(entry["output"])):
+            continue
+        lines = [f"{source} -> {entry['output']}", f"last rebuilt: {entry.get('reason') or 'unknown'}"]
+        lines.extend(f"depends on {path}" for path in sorted(entry.get("deps", {})))
+        if not os.path.exists(source):
+            lines.append("next build: source deleted, output will be removed")
+            return "\n".join(lines)
+        template_path = page_template_path(source, read_front_matter(source), args.content, args.template, {})
+        deps = dependency_hashes(load_template(template_path, args.partials).dependencies, {})
+        reason = manifest.stale_reason(source, hash_file(source), entry["output"], deps)
+        lines.append(f"next build: {'up to date' if reason is None else reason}")
+        return "\n".join(lines)
+    dependents = set()
+    for path in {path for entry in manifest.pages.values() for path in entry.get("deps", {})}:
+        if os.path.abspath(path) == target:
+            dependents.update(manifest.dependents(path))
+    if len(dependents) > 0:
+        return "\n".join([f"{args.target} is used by {len(dependents)} page(s):"] + [f"  {source}" for source in sorted(dependents)])
+    return f"{args.target} is not a page or template of the last build."
+
+
+def is_within(path:str, root:str) -> bool:
+    """True if path is root or inside it."""
+    return path == root or path.startswith(root + os.sep)
 
 def copy_files(source:str, destination:str, destination_root:str|None=None) -> None:
     """Recursively copy files from source to destination."""
-    print(f"Copying from {source} to {destination}")
+    log = get_log()
+    log.info(f"Copying from {source} to {destination}")
     if destination_root is None:
         destination_root = destination
         if os.path.exists(destination_root):
-            print(f"cleaning destination first!")
-            print(f"list of destination pre clean: {os.listdir(destination)}")
+            log.info(f"cleaning destination {destination} first!")
             shutil.rmtree(destination)
-        os.mkdir(destination)        
+        os.makedirs(destination, exist_ok=True)
     if not os.path.exists(source):
-        print("Source does not exists")
         raise Exception("Source does not exist.")
     
     # loop over it in source, if file copy to destination, if dir, call self.
     for item in os.listdir(source):
         item_path = os.path.join(source, item)
         if os.path.isfile(item_path):
-            print(f"{item} is a file, copying...")
             shutil.copy(item_path, destination)
-            if os.path.exists(os.path.join(destination, item)):
-                print(f"{item} successfully copied.")
-            else:
-                print(f"Error {item} failed to copy.")
+            log.info(f"{item} copied.")
+            log.event("file_copied", path=item_path)
         else:
-            print(f"{item} is a dir, create and copy content...")
-            os.mkdir(os.path.join(destination, item))
+            os.makedirs(os.path.join(destination, item), exist_ok=True)
             copy_files(item_path, os.path.join(destination, item), destination)
-            print(f"{item} created and populated.")
+            log.info(f"{item} created and populated.")
     if destination == destination_root:
-        print("Copy successful")
+        log.info("Copy successful")
     return
 
 
-def output_html(to_path:str, html:str) -> None:
-    """Output HTML to file."""
-    print(f"Outputting HTML file to {to_path}")
-    with open(os.path.join(to_path), 'w', encoding="utf-8") as output:
-        output.write(html)
-        output.close
+def output_html(to_path:str, html:str|Iterable[str]) -> None:
+    """Output HTML to file, streaming it chunk by chunk when given an iterable."""
+    get_log().info(f"Outputting HTML file to {to_path}")
+    tmp_path = f"{to_path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding="utf-8") as output:
+            if isinstance(html, str):
+                output.write(html)
+            else:
+                output.writelines(html)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, to_path)
 
-def generate_pages_recursive(dir_path_content:str, template_path:str, dest_dir_path:str) -> None:
-    """Recursively generate markdown pages."""
-    if not os.path.exists(dest_dir_path):
-        print(f"{dest_dir_path} does not exist, creating..")
-        os.mkdir(dest_dir_path)
+def generate_pages_recursive(dir_path_content:str, template_path:str, dest_dir_path:str, manifest:BuildManifest|None=None, jobs:int=1, renderer:str="tree", parse_cache:ParseCache|None=None, partials_dir:str|None=None, drafts:bool=False) -> None:
+    """Generate every markdown page under dir_path_content, skipping unchanged ones when a manifest is given."""
+    generate_pages(discover_pages(dir_path_content, dest_dir_path), template_path, manifest, jobs, renderer, parse_cache,
+                   dir_path_content, partials_dir, drafts)
 
-    for item in os.listdir(dir_path_content):
+
+def generate_pages(pages:list[tuple[str, str]], template_path:str, manifest:BuildManifest|None=None, jobs:int=1, renderer:str="tree", parse_cache:ParseCache|None=None, content_dir:str|None=None, partials_dir:str|None=None, drafts:bool=False) -> None:
+    """Generate the given (source, destination) pages serially or across a process pool.
+
+    A page uses the template named by its front matter, else pages under
+    content_dir use the nearest directory template, falling back to
+    template_path. Only the front matter of a page is read to pick its
+    template and skip drafts, unless drafts is set; a previously built
+    draft is removed.
+    With a manifest, a page is only generated when its source or one of
+    its templates and partials changed. A parse_cache is only used
+    together with a manifest, whose source hashes key its entries.
+    """
+    if manifest is None:
+        parse_cache = None
+
+    profiler = get_profiler()
+    log = get_log()
+    selected = {}
+    known_hashes = {}
+    pending = []
+    failures = []
+    for from_path, dest_path in pages:
+        with profiler.stage("front matter"):
+            try:
+                front_matter = read_front_matter(from_path)
+            except ValueError as front_matter_error:
+                failures.append(f"{from_path}: ValueError: {front_matter_error}")
+                continue
+        if is_draft(front_matter) and not drafts:
+            log.info(f"{from_path} is a draft, skipping")
+            log.event("page_draft", source=from_path)
+            output = None if manifest is None else manifest.forget(from_path)
+            if output is not None and os.path.exists(output):
+                log.event("page_removed", output=output)
+                os.remove(output)
+            continue
+        page_template = page_template_path(from_path, front_matter, content_dir, template_path, selected)
+        if not os.path.isfile(page_template):
+            failures.append(f"{from_path}: Template {page_template} not found.")
+            continue
+        source_hash = None
+        deps = None
+        reason = None
+        if manifest is not None:
+            with profiler.stage("source hash"):
+                source_hash = hash_file(from_path)
+                deps = dependency_hashes(load_template(page_template, partials_dir).dependencies, known_hashes)
+            reason = manifest.check(from_path, source_hash, dest_path, deps)
+            if reason is None:
+                log.info(f"{from_path} unchanged, skipping")
+                log.event("page_unchanged", source=from_path)
+                continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        pending.append((from_path, dest_path, page_template, source_hash, deps, reason))
+
+    options = {
+        "renderer": renderer,
+        "block_cache_bytes": get_block_cache().max_bytes,
+        "parse_cache": None if parse_cache is None else parse_cache.directory,
+        "partials": partials_dir,
+        "asset_urls": get_asset_urls(),
+        "profile": profiler.enabled,
+    }
+    page_jobs = [(from_path, page_template, dest_path, source_hash, options) for from_path, dest_path, page_template, source_hash, _, _ in pending]
+    if jobs == 1 or len(page_jobs) <= 1:
+        results = list(map(build_page_job, page_jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunksize = max(1, len(page_jobs) // (jobs * 4))
+            results = list(executor.map(build_page_job, page_jobs, chunksize=chunksize))
+
+    counts = {}
+    for (from_path, dest_path, _, source_hash, deps, reason), (error, profile, page_counts, metadata) in zip(pending, results):
+        for name, count in page_counts.items():
+            counts[name] = counts.get(name, 0) + count
+        if profile is not None:
+            profiler.merge(profile)
+        if error is not None:
+            failures.append(f"{from_path}: {error}")
+            continue
+        log.event("page_generated", source=from_path, output=dest_path, reason=reason)
+        if manifest is not None:
+            manifest.record(from_path, source_hash, dest_path, deps, reason, metadata)
+    for name, count in counts.items():
+        if count > 0:
+            log.event(name, count=count)
+    if len(failures) > 0:
+        raise Exception("Failed to generate pages:\n" + "\n".join(failures))
+
+
+def page_template_path(from_path:str, front_matter:dict, content_dir:str|None, default_template:str, selected:dict[str, str]) -> str:
+    """Return the template of a page: its front matter template, relative to the page, or select_template's choice."""
+    template = front_matter.get("template")
+    if template is not None:
+        return os.path.join(os.path.dirname(from_path), str(template))
+    if content_dir is None:
+        return default_template
+    return select_template(os.path.dirname(from_path), content_dir, default_template, selected)
+
+
+def select_template(directory:str, content_dir:str, default_template:str, selected:dict[str, str]) -> str:
+    """Return the nearest directory template from directory up to content_dir, else default_template.
+
+    selected memoizes the answer per directory across the pages of a build.
+    """
+    template = selected.get(directory)
+    if template is not None:
+        return template
+    parent = os.path.dirname(directory)
+    if os.path.isfile(os.path.join(directory, DIRECTORY_TEMPLATE)):
+        template = os.path.join(directory, DIRECTORY_TEMPLATE)
+    elif parent == directory or not is_within(os.path.abspath(parent), os.path.abspath(content_dir)):
+        template = default_template
+    else:
+        template = select_template(parent, content_dir, default_template, selected)
+    selected[directory] = template
+    return template
+
+
+def dependency_hashes(paths:list[str], known_hashes:dict[str, str]) -> dict[str, str]:
+    """Return {path: content hash} for a page's templates, hashing each file once per build.
+
+    Pages rendered with fingerprinted asset URLs also depend on the asset
+    URL map, recorded under ASSET_MANIFEST.
+    """
+    deps = {}
+    for path in paths:
+        if path not in known_hashes:
+            known_hashes[path] = hash_file(path)
+        deps[path] = known_hashes[path]
+    digest = asset_urls_digest()
+    if digest is not None:
+        deps[ASSET_MANIFEST] = digest
+    return deps
+
+
+def discover_pages(dir_path_content:str, dest_dir_path:str) -> list[tuple[str, str]]:
+    """Return sorted (markdown source, html destination) pairs under dir_path_content.
+
+    Files and directories starting with _, such as directory templates, are not pages.
+    """
+    pages = []
+    for item in sorted(os.listdir(dir_path_content)):
+        if item.startswith("_"):
+            continue
         item_path = os.path.join(dir_path_content, item)
         if os.path.isfile(item_path):
-            print(f"generating {item}")
-            new_file_name = f"{item.split('.')[0]}.html"
-            generate_page(item_path, template_path, os.path.join(dest_dir_path, new_file_name))
+            pages.append((item_path, os.path.join(dest_dir_path, f"{item.split('.')[0]}.html")))
         else:
-            generate_pages_recursive(item_path, template_path, os.path.join(dest_dir_path, item))
-
-
-def generate_page(from_path:str, template_path:str, dest_path:str) -> None:
-    """Generate HTML from template and markdown."""
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    markdown = None
-    template = None
-    with open(from_path, 'r', encoding="utf-8") as from_file:
-        markdown = from_file.read()
-        from_file.close()
-    if markdown is None:
-        raise Exception(f"Failed to read content from {from_path}")
-    with open(template_path, 'r', encoding="utf-8") as template_file:
-        template = template_file.read()
-        template_file.close()
-    if template is None:
-        raise Exception(f"Failed to read content from {from_path}")
-    html = markdown_to_html(markdown).to_html()
-    title = extract_title(markdown)
-
-    new_html = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
-    output_html(dest_path, new_html)
+            pages.extend(discover_pages(item_path, os.path.join(dest_dir_path, item)))
+    return pages
+
+
+def page_dest_path(from_path:str, dir_path_content:str, dest_dir_path:str) -> str:
+    """Return the html destination of a markdown source under dir_path_content."""
+    rel_dir, item = os.path.split(os.path.relpath(from_path, dir_path_content))
+    return os.path.join(dest_dir_path, rel_dir, f"{item.split('.')[0]}.html")
+
+
+def build_page_job(job:tuple[str, str, str, str|None, dict]) -> tuple[str|None, dict|None, dict[str, int], dict|None]:
+    """Generate one page, returning the error message instead of raising so pool results stay ordered.
+
+    When profiling, the page is timed by a fresh profiler whose data is
+    returned for the parent process to merge. The block and parse cache
+    hits and misses and the page metadata are returned the same way.
+    """
+    from_path, template_path, dest_path, source_hash, options = job
+    error = None
+    profile_data = None
+    metadata = None
+    block_cache = get_block_cache()
+    if block_cache.max_bytes != options["block_cache_bytes"]:
+        # a worker process that did not inherit the parent's cache.
+        block_cache = create_block_cache(options["block_cache_bytes"])
+        set_block_cache(block_cache)
+    hits, misses = block_cache.hits, block_cache.misses
+    # a no-op unless this is a worker process that did not inherit the parent's map.
+    set_asset_urls(options["asset_urls"])
+    parse_cache = None if options["parse_cache"] is None else ParseCache(options["parse_cache"], asset_urls_digest())
+    previous = set_profiler(BuildProfiler()) if options["profile"] else None
+    try:
+        with get_profiler().page(from_path):
+            metadata = generate_page(from_path, template_path, dest_path, options["renderer"], parse_cache, source_hash, options["partials"])
+    except Exception as page_error:
+        error = f"{type(page_error).__name__}: {page_error}"
+    finally:
+        if options["profile"]:
+            profile_data = set_profiler(previous).to_dict()
+    counts = {"block_cache_hit": block_cache.hits - hits, "block_cache_miss": block_cache.misses - misses}
+    if parse_cache is not None:
+        counts["parse_cache_hit"] = parse_cache.hits
+        counts["parse_cache_miss"] = parse_cache.misses
+    return error, profile_data, counts, metadata
+
+
+def remove_stale_pages(manifest:BuildManifest) -> None:
+    """Delete output pages whose markdown source no longer exists."""
+    for output in manifest.prune():
+        if os.path.exists(output):
+            get_log().info(f"Removing stale page {output}")
+            get_log().event("page_removed", output=output)
+            os.remove(output)
+
+
+def generate_sections(manifest:BuildManifest, content_dir:str, output_dir:str, per_page:int=20, partials_dir:str|None=None) -> dict:
+    """Write the listing pages of every section with a _list.html template, returning counts.
+
+    Listings are built from the page metadata in the manifest, newest date
+    first, without reading page sources. A section whose entries,
+    templates and page size are unchanged is skipped, and each listing
+    page is streamed to disk before the next one is rendered.
+    """
+    if per_page < 1:
+        raise ValueError(f"Invalid page size {per_page}.")
+    log = get_log()
+    stats = {"generated": 0, "unchanged": 0, "removed": 0}
+    index = manifest.site_index()
+    children, index_pages = group_sections(index, content_dir)
+    previous = manifest.listings
+    current = {}
+    known_hashes = {}
+    for directory in sorted(children):
+        template_path = os.path.join(directory, LIST_TEMPLATE)
+        if not os.path.isfile(template_path):
+            continue
+        template = load_template(template_path, partials_dir)
+        deps = dependency_hashes(template.dependencies, known_hashes)
+        # dated pages newest first, then undated ones, each in source order.
+        entries = sorted(children[directory], key=lambda entry: str(entry.get("front_matter", {}).get("date") or ""), reverse=True)
+        index_page = index_pages.get(directory)
+        title = os.path.basename(os.path.normpath(directory)) if index_page is None else index_page["title"]
+        section_out = os.path.join(output_dir, os.path.relpath(directory, content_dir))
+        outputs = [listing_output(section_out, number, index_page is not None) for number in range(1, (len(entries) + per_page - 1) // per_page + 1)]
+        fingerprint = section_fingerprint(title, entries, per_page, deps)
+        current[directory] = {"hash": fingerprint, "outputs": outputs}
+        entry = previous.get(directory)
+        if entry is not None and entry["hash"] == fingerprint and all(os.path.exists(output) for output in outputs):
+            stats["unchanged"] += len(outputs)
+            continue
+        for number, output in enumerate(outputs, start=1):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            page_entries = entries[(number - 1) * per_page:number * per_page]
+            output_html(output, template.iter_render({
+                "Title": title,
+                "Content": iter_entries_html(page_entries, output_dir),
+                "Pagination": pagination_html(outputs, number, output_dir),
+            }))
+            log.info(f"Listing page {number} of {directory} written to {output}")
+            log.event("listing_generated", section=directory, output=output)
+            stats["generated"] += 1
+
+    # a section's new index page may have taken over its first listing page.
+    kept = {output for entry in current.values() for output in entry["outputs"]}
+    kept.update(meta["output"] for meta in index.values())
+    for entry in previous.values():
+        for output in entry["outputs"]:
+            if output not in kept and os.path.exists(output):
+                os.remove(output)
+                log.event("listing_removed", output=output)
+                stats["removed"] += 1
+    manifest.listings = current
+    return stats
+
+
+def generate_feeds(manifest:BuildManifest, output_dir:str, base_url:str|None, sitemap_limit:int=SITEMAP_LIMIT) -> int:
+    """Write sitemap.xml, split into shards past sitemap_limit URLs, and the Atom feed; return the files written.
+
+    Nothing is written without a base_url, since both need absolute URLs.
+    They are only rewritten when the URL, title or date of a page changed,
+    and are streamed to disk a URL at a time.
+    """
+    log = get_log()
+    index = manifest.site_index()
+    previous = manifest.feeds
+    outputs = []
+    fingerprint = None
+    if base_url is not None and len(index) > 0:
+        fingerprint = feeds_fingerprint(base_url, index, sitemap_limit)
+        outputs = sitemap_outputs(output_dir, len(index), sitemap_limit)
+        feed_entries = newest_entries(index, output_dir, base_url)
+        if len(feed_entries) > 0:
+            outputs.append(os.path.join(output_dir, FEED))
+    written = 0
+    if fingerprint is not None and (previous.get("hash") != fingerprint or not all(os.path.exists(output) for output in outputs)):
+        entries = [(absolute_url(base_url, page_url(meta["output"], output_dir)), page_date(meta)) for meta in index.values()]
+        shards = [output for output in outputs[1:] if os.path.basename(output) != FEED]
+        if len(shards) == 0:
+            output_html(outputs[0], iter_sitemap(entries))
+        else:
+            for number, shard in enumerate(shards):
+                output_html(shard, iter_sitemap(entries[number * sitemap_limit:(number + 1) * sitemap_limit]))
+            output_html(outputs[0], iter_sitemap_index([absolute_url(base_url, page_url(shard, output_dir)) for shard in shards]))
+        written = 1 + len(shards)
+        if len(feed_entries) > 0:
+            # the feed is titled after the home page.
+            home = next((meta for meta in index.values() if meta["output"] == os.path.join(output_dir, "index.html")), None)
+            site_url = absolute_url(base_url, "/")
+            title = site_url if home is None else home["title"]
+            output_html(outputs[-1], iter_atom_feed(title, absolute_url(base_url, f"/{FEED}"), site_url, feed_entries))
+            written += 1
+        log.info(f"Wrote {written} sitemap and feed file(s)")
+        log.event("feeds_generated", files=written, urls=len(entries))
+    for output in previous.get("outputs", []):
+        if output not in outputs and os.path.exists(output):
+            os.remove(output)
+            log.event("feed_removed", output=output)
+    manifest.feeds = {} if fingerprint is None else {"hash": fingerprint, "outputs": outputs}
+    return written
+
+
+def generate_page(from_path:str, template_path:str, dest_path:str, renderer:str="tree", parse_cache:ParseCache|None=None, source_hash:str|None=None, partials_dir:str|None=None) -> dict:
+    """Generate HTML from template and markdown, through the node tree or the direct renderer.
+
+    Returns the page metadata collected while parsing. With a parse_cache,
+    the metadata and body HTML stored for source_hash are reused instead of
+    reading and parsing the markdown again; a freshly parsed body is
+    collected for the cache as it streams to disk.
+    """
+    get_log().info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if renderer not in RENDERERS:
+        raise ValueError(f"Invalid renderer {renderer}.")
+    profiler = get_profiler()
+    template = load_template(template_path, partials_dir)
+    cached = None
+    collected = None
+    if parse_cache is not None:
+        with profiler.stage("parse cache"):
+            cached = parse_cache.get(source_hash)
+    if cached is not None:
+        metadata, html = cached
+    else:
+        markdown = None
+        with profiler.stage("file read"):
+            with open(from_path, 'r', encoding="utf-8") as from_file:
+                markdown = from_file.read()
+                from_file.close()
+        if markdown is None:
+            raise Exception(f"Failed to read content from {from_path}")
+        with profiler.stage("front matter"):
+            front_matter, markdown = split_front_matter(markdown)
+        title = front_matter.get("title")
+        metadata = new_page_metadata(extract_title(markdown) if title is None else str(title), front_matter)
+        block_cache = get_block_cache()
+        if not block_cache.enabled:
+            block_cache = None
+        if profiler.enabled:
+            # profiling times each stage on its own, so materialize instead of streaming.
+            html = render_markdown(markdown, renderer, block_cache, metadata)
+            if parse_cache is not None:
+                with profiler.stage("parse cache"):
+                    parse_cache.put(source_hash, metadata, html)
+        else:
+            if renderer == "direct":
+                html = iter_markdown_html(markdown, block_cache, metadata)
+            else:
+                html = markdown_to_html(markdown, block_cache, metadata).iter_html()
+            if parse_cache is not None:
+                collected = []
+                html = collect_chunks(html, collected)
+    if profiler.enabled:
+        with profiler.stage("template substitution"):
+            new_html = template.render({"Title": metadata["title"], "Content": html})
+        with profiler.stage("write"):
+            output_html(dest_path, new_html)
+        return metadata
+    output_html(dest_path, template.iter_render({"Title": metadata["title"], "Content": html}))
+    if collected is not None:
+        # the metadata is complete once the body has been streamed.
+        parse_cache.put(source_hash, metadata, "".join(collected))
+    return metadata
+
+
+def collect_chunks(chunks:Iterable[str], collected:list[str]) -> Iterator[str]:
+    """Pass chunks through, keeping each one in collected."""
+    for chunk in chunks:
+        collected.append(chunk)
+        yield chunk
+
+
+def render_markdown(markdown:str, renderer:str, block_cache:BlockCache|None=None, metadata:dict|None=None) -> str:
+    """Render the body HTML of a page with the given renderer."""
+    profiler = get_profiler()
+    if renderer == "direct":
+        with profiler.stage("direct render"):
+            return markdown_to_html_string(markdown, block_cache, metadata)
+    root = markdown_to_html(markdown, block_cache, metadata)
+    with profiler.stage("to_html"):
+        return root.to_html()
 
 
 def extract_title(markdown: str) -> str:
-    """Extract H1 header from markdown."""
-    lines = markdown.split("\n")
-    header_list = list(filter(lambda x: x.startswith("# "), lines))
-    if len(header_list) == 0:
-        raise Exception("No Header found in text.")
-    return header_list[0][2:].strip()
+    """Extract the first line starting with "# " from markdown, scanning only up to it."""
+    if markdown.startswith("# "):
+        start = 2
+    else:
+        start = markdown.find("\n# ")
+        if start == -1:
+            raise Exception("No Header found in text.")
+        start += 3
+    end = markdown.find("\n", start)
+    return markdown[start:len(markdown) if end == -1 else end].strip()
 
 
 def strip_markdown_syntax(string_to_strip:str, block_type:str):
     """Strips markdown syntax from blocks."""
-    if block_type == "paragraph":
-        return string_to_strip.strip()
-    if block_type == "heading":
-        return string_to_strip[get_heading_count(string_to_strip)+1:].strip()
-    if block_type == "code":
-        return string_to_strip.removeprefix("```").removesuffix("```").strip()
-    if block_type == "quote":
-        return string_to_strip.removeprefix(">").strip()
-    if block_type == "ordered_list":
-        start_index = (string_to_strip.find(". "))+2
-        return string_to_strip[start_index:].strip()
-    if block_type == "unordered_list":
-        return string_to_strip[2:].strip()
+    strip = BLOCK_STRIPPERS.get(block_type)
+    if strip is None:
+        return None
+    return strip(string_to_strip)
 
 
 def get_heading_count(text:str)-> int:
     """return heading cound based on num of # prefix."""
-    if text.startswith("# "): return 1
-    if text.startswith("## "): return 2
-    if text.startswith("### "): return 3
-    if text.startswith("#### "): return 4
-    if text.startswith("##### "): return 5
-    if text.startswith("###### "): return 6
+    count = len(text) - len(text.lstrip("#"))
+    if 1 <= count <= 6 and text.startswith(" ", count):
+        return count
+
+
+def inline_children(text:str) -> list:
+    """Convert inline markdown to a list of LeafNodes."""
+    return [text_node_to_html_node(node) for node in text_to_textnodes(text)]
 
 
 def populate_html_node_for_list_blocks(list_type:str, block:str):
     """Convert each line in a block for a given list type."""
-    tag = ""
-    if list_type == "ordered_list":
-        tag = "ol"
-    else:
-        tag ="ul"
-
+    tag = "ol" if list_type == "ordered_list" else "ul"
     list_nodes = []
     for line in block.split("\n"):
-        line_nodes = text_to_textnodes(strip_markdown_syntax(line, list_type))
-        line_children = list(map(lambda x: text_node_to_html_node(x), line_nodes))
-        list_nodes.append(ParentNode("li", line_children))
+        list_nodes.append(ParentNode("li", inline_children(strip_markdown_syntax(line, list_type))))
     return ParentNode(tag, list_nodes)
 
 
 def populate_html_node_for_block(block_type:str, block:str) -> ParentNode:
     """Convert block to Parent and LeafNodes."""
-    if block_type == "quote":
-        new_lines = []
-        for line in block.split("\n"):
-            new_lines.append(strip_markdown_syntax(line, block_type))
-        cleaned_block = "\n".join(new_lines)
-        node_list = text_to_textnodes(cleaned_block)
-        child_nodes =list(map(lambda x: text_node_to_html_node(x), node_list))
-        return ParentNode(f"blockquote", child_nodes)
-    if block_type not in ("ordered_list", "unordered_list"):
-        node_list = text_to_textnodes(strip_markdown_syntax(block, block_type))
-        child_nodes =list(map(lambda x: text_node_to_html_node(x), node_list))
-        if block_type == "paragraph":
-            return ParentNode("p", child_nodes)
-        if block_type == "heading":
-            return ParentNode(f"h{get_heading_count(block)}", child_nodes)
-        if block_type == "code":
-            code_node = ParentNode("code", child_nodes)
-            return ParentNode("pre", [code_node])
-
-    return populate_html_node_for_list_blocks(block_type, block)
-
-
-def markdown_to_html(markdown:str)-> ParentNode:
-    """Take markdown and convert to HTML Nodes"""
-    blocks = markdown_to_blocks(markdown)
+    render = BLOCK_RENDERERS.get(block_type)
+    if render is None:
+        raise ValueError("Invalid block type.")
+    return render(block)
+
+
+def render_quote_block(block:str) -> ParentNode:
+    cleaned_block = "\n".join(strip_markdown_syntax(line, "quote") for line in block.split("\n"))
+    return ParentNode("blockquote", inline_children(cleaned_block))
+
+
+def render_code_block(block:str) -> ParentNode:
+    return ParentNode("pre", [ParentNode("code", inline_children(strip_markdown_syntax(block, "code")))])
+
+
+def block_to_html(block_type:str, block:str) -> str:
+    """Render a block straight to HTML, as populate_html_node_for_block(...).to_html() would."""
+    render_html = BLOCK_HTML_RENDERERS.get(block_type)
+    if render_html is None:
+        return populate_html_node_for_block(block_type, block).to_html()
+    return render_html(block)
+
+
+def list_block_to_html(list_type:str, block:str) -> str:
+    tag = "ol" if list_type == "ordered_list" else "ul"
+    items = "".join([f"<li>{inline_to_html(strip_markdown_syntax(line, list_type))}</li>" for line in block.split("\n")])
+    return f"<{tag}>{items}</{tag}>"
+
+
+def heading_block_to_html(block:str) -> str:
+    count = get_heading_count(block)
+    return f"<h{count}>{inline_to_html(strip_markdown_syntax(block, 'heading'))}</h{count}>"
+
+
+def quote_block_to_html(block:str) -> str:
+    cleaned_block = "\n".join(strip_markdown_syntax(line, "quote") for line in block.split("\n"))
+    return f"<blockquote>{inline_to_html(cleaned_block)}</blockquote>"
+
+
+# first character of a block -> [(block type, matcher)], so a block is only
+# tested against the types it can possibly be.
+BLOCK_MATCHERS = {}
+# matchers that cannot be keyed on a first character, tried after those.
+GENERIC_BLOCK_MATCHERS = []
+BLOCK_STRIPPERS = {}
+BLOCK_RENDERERS = {}
+# block type -> function rendering it straight to an HTML string, used by the direct renderer.
+BLOCK_HTML_RENDERERS = {}
+
+
+def register_block_type(block_type:str, matches:Callable[[str], bool]|None, render:Callable[[str], ParentNode], strip:Callable[[str], str]|None=None, first_chars:str|None=None, render_html:Callable[[str], str]|None=None) -> None:
+    """Register how a block type is detected, stripped of its syntax and rendered.
+
+    Blocks are only tested with matches when they start with one of
+    first_chars, or always when first_chars is None. A matches of None
+    registers a type that is never detected, like the paragraph default.
+    Without render_html the direct renderer renders the block through render.
+    """
+    if matches is not None:
+        if first_chars is None:
+            GENERIC_BLOCK_MATCHERS.append((block_type, matches))
+        else:
+            for char in first_chars:
+                BLOCK_MATCHERS.setdefault(char, []).append((block_type, matches))
+    BLOCK_RENDERERS[block_type] = render
+    get_block_cache().clear()
+    if render_html is None:
+        BLOCK_HTML_RENDERERS.pop(block_type, None)
+    else:
+        BLOCK_HTML_RENDERERS[block_type] = render_html
+    if strip is not None:
+        BLOCK_STRIPPERS[block_type] = strip
+
+
+register_block_type("paragraph", None, lambda block: ParentNode("p", inline_children(strip_markdown_syntax(block, "paragraph"))),
+                    lambda text: text.strip(),
+                    render_html=lambda block: f"<p>{inline_to_html(strip_markdown_syntax(block, 'paragraph'))}</p>")
+register_block_type("heading", lambda block: get_heading_count(block) is not None,
+                    lambda block: ParentNode(f"h{get_heading_count(block)}", inline_children(strip_markdown_syntax(block, "heading"))),
+                    lambda text: text[get_heading_count(text)+1:].strip(), "#",
+                    render_html=heading_block_to_html)
+register_block_type("code", lambda block: block.startswith("```") and block.endswith("```"), render_code_block,
+                    lambda text: text.removeprefix("```").removesuffix("```").strip(), "`",
+                    render_html=lambda block: f"<pre><code>{inline_to_html(strip_markdown_syntax(block, 'code'))}</code></pre>")
+register_block_type("quote", lambda block: True, render_quote_block, lambda text: text.removeprefix(">").strip(), ">",
+                    render_html=quote_block_to_html)
+register_block_type("ordered_list", lambda block: block.startswith(". ", 1) and block[0].isnumeric(),
+                    lambda block: populate_html_node_for_list_blocks("ordered_list", block),
+                    lambda text: text[text.find(". ")+2:].strip(),
+                    render_html=lambda block: list_block_to_html("ordered_list", block))
+register_block_type("unordered_list", lambda block: block.startswith(("- ", "* ")),
+                    lambda block: populate_html_node_for_list_blocks("unordered_list", block),
+                    lambda text: text[2:].strip(), "-*",
+                    render_html=lambda block: list_block_to_html("unordered_list", block))
+
+
+def markdown_to_html(markdown:str, block_cache:BlockCache|None=None, metadata:dict|None=None)-> ParentNode:
+    """Take markdown and convert to HTML Nodes.
+
+    With a block_cache, each block becomes a text LeafNode holding its
+    rendered HTML, which is reused for blocks seen before. A metadata dict
+    from new_page_metadata is filled in while the blocks are scanned.
+    """
+    profiler = get_profiler()
+    blocks = iter_block_strings(markdown)
+    if metadata is not None:
+        blocks = collect_metadata(blocks, metadata)
     block_html_nodes = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
+    while True:
+        with profiler.stage("markdown_to_blocks"):
+            block = next(blocks, None)
+        if block is None:
+            break
+        if block_cache is not None:
+            block_html_nodes.append(LeafNode(None, block_cache.render(block, render_block_tree)))
+            continue
+        with profiler.stage("block_to_block_type"):
+            block_type = block_to_block_type(block)
         block_html_nodes.append(populate_html_node_for_block(block_type, block))
     return ParentNode("div", block_html_nodes)
 
 
+def iter_markdown_html(markdown:str, block_cache:BlockCache|None=None, metadata:dict|None=None) -> Iterator[str]:
+    """Yield the HTML of markdown block by block, straight from the scanners without building nodes.
+
+    The output is byte-identical to markdown_to_html(markdown).to_html().
+    """
+    blocks = iter_block_strings(markdown)
+    if metadata is not None:
+        blocks = collect_metadata(blocks, metadata)
+    first = next(blocks, None)
+    if first is None:
+        raise ValueError("Expected Children.")
+    yield "<div>"
+    if block_cache is None:
+        yield render_block_direct(first)
+        yield from map(render_block_direct, blocks)
+    else:
+        yield block_cache.render(first, render_block_direct)
+        for block in blocks:
+            yield block_cache.render(block, render_block_direct)
+    yield "</div>"
+
+
+def markdown_to_html_string(markdown:str, block_cache:BlockCache|None=None, metadata:dict|None=None) -> str:
+    """Render markdown straight to an HTML string, see iter_markdown_html."""
+    return "".join(iter_markdown_html(markdown, block_cache, metadata))
+
+
+WORD_RE = re.compile(r"\w[\w'-]*")
+LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+
+
+def new_page_metadata(title:str, front_matter:dict|None=None) -> dict:
+    """Return page metadata for collect_metadata to fill in, keeping the page's front matter."""
+    return {"title": title, "front_matter": front_matter or {}, "headings": [], "words": 0, "links": []}
+
+
+def collect_metadata(blocks:Iterator[str], metadata:dict) -> Iterator[str]:
+    """Pass blocks through, adding their headings, word count and outbound links to metadata."""
+    for block in blocks:
+        count = get_heading_count(block) if block[0] == "#" else None
+        if count is not None:
+            metadata["headings"].append([count, block[count+1:].strip()])
+        if "](" in block:
+            metadata["links"].extend(url for _, url in LINK_RE.findall(block))
+            # link and image targets are not words of the page.
+            metadata["words"] += len(WORD_RE.findall(LINK_TARGET_RE.sub("]", block)))
+        else:
+            metadata["words"] += len(WORD_RE.findall(block))
+        yield block
+
+
+def render_block_tree(block:str) -> str:
+    """Render a block to HTML through its nodes."""
+    profiler = get_profiler()
+    with profiler.stage("block_to_block_type"):
+        block_type = block_to_block_type(block)
+    node = populate_html_node_for_block(block_type, block)
+    # cached blocks are serialized here, outside render_markdown's to_html stage.
+    with profiler.stage("to_html"):
+        return node.to_html()
+
+
+def render_block_direct(block:str) -> str:
+    """Render a block straight to HTML."""
+    return block_to_html(block_to_block_type(block), block)
+
+
 def markdown_to_blocks(markdown:str) -> list[str]:
     """split a body of markdown into list of blocks."""
-    #blocks = markdown.splitlines(keepends=True)
-    blocks = markdown.split("\n\n")
-    blocks = list(map(lambda x: x.strip(), blocks))
-    blocks = list(filter(lambda x: x!="", blocks))
-    return blocks
+    return list(iter_block_strings(markdown))
+
+
+# an opening fence line: ``` and an optional info string, with no backticks after them.
+OPENING_FENCE_RE = re.compile(r"```[^`]*")
+CLOSING_FENCE_RE = re.compile(r"```[ \t]*$", re.MULTILINE)
+
+
+def iter_block_strings(markdown:str) -> Iterator[str]:
+    """Lazily yield the stripped, non-empty blocks separated by blank lines.
+
+    A block opening a code fence that is not closed within the block runs on
+    to the closing fence, so fenced code may contain blank lines. An unclosed
+    fence is split on blank lines like any other text.
+    """
+    pieces = markdown.split("\n\n")
+    rest = iter(pieces)
+    for block in map(str.strip, rest):
+        if not block:
+            continue
+        if block[0] == "`" and (len(block) < 6 or block[-3:] != "```") and is_open_fence(block):
+            # map has taken nothing past this block, so the iterator's length hint locates its raw piece.
+            held = [pieces[len(pieces) - length_hint(rest) - 1]]
+            for next_piece in rest:
+                held.append(next_piece)
+                if CLOSING_FENCE_RE.search(next_piece) is not None:
+                    yield "\n\n".join(held).strip()
+                    break
+            else:
+                yield block
+                yield from filter(None, map(str.strip, held[1:]))
+            continue
+        yield block
+
+
+def is_open_fence(block:str) -> bool:
+    """Return True if the first line of block is an opening fence that the block does not close."""
+    first_line, newline, rest = block.partition("\n")
+    if OPENING_FENCE_RE.fullmatch(first_line.rstrip()) is None:
+        return False
+    return not newline or CLOSING_FENCE_RE.search(rest) is None
 
 
 def block_to_block_type(block_str:str) -> str:
     """return the type based on block string."""
-    if block_str.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return "heading"
-    if block_str.startswith("```") and block_str.endswith("```"):
-        return "code"
-    if block_str.startswith(">"):
-        return "quote"
-    if block_str.startswith(". ", 1) and block_str[0].isnumeric():
-        return "ordered_list"
-    if block_str.startswith(("- ", "* ")):
-        return "unordered_list"
-    return "paragraph"    
+    for block_type, matches in BLOCK_MATCHERS.get(block_str[:1], ()):
+        if matches(block_str):
+            return block_type
+    for block_type, matches in GENERIC_BLOCK_MATCHERS:
+        if matches(block_str):
+            return block_type
+    return "paragraph"
 
 
 def text_to_textnodes(text: str) -> list[TextNode]:
     """Split markdown text into TextNodes."""
-    node_list = [
-        TextNode(text, text_type_text[0])
-    ]
-    node_list = split_nodes_delimiter(node_list, text_type_bold[1], text_type_bold[0])
-    node_list = split_nodes_delimiter(node_list, text_type_italic[1], text_type_italic[0])
-    node_list = split_nodes_delimiter(node_list, text_type_code[1], text_type_code[0])
-    node_list = split_nodes_image(node_list)
-    node_list = split_nodes_link(node_list)
-
-    return node_list
+    with get_profiler().stage("text_to_textnodes"):
+        return tokenize_inline(text)
 
 
 def validate_delimiter_for_type(delimiter: str, text_type:str):
-    if text_type == text_type_text[0] and delimiter == text_type_text[1]:
-        return True
-    if text_type == text_type_bold[0] and delimiter == text_type_bold[1]:
-        return True
-    if text_type == text_type_italic[0] and delimiter == text_type_italic[1]:
-        return True
-    if text_type == text_type_code[0] and delimiter == text_type_code[1]:
-        return True
-    if text_type == text_type_link[0] and delimiter == text_type_link[1]:
-        return True
-    if text_type == text_type_image[0] and delimiter == text_type_image[1]:
+    syntax = INLINE_SYNTAX.get(text_type)
+    if syntax is not None and syntax[0] == delimiter:
         return True
     raise ValueError("Invalid delimiter for given text type.")
 
 
 def set_closing_delimiter(text_type:str)-> str:
     """Return closing delimiter for a given markdown type."""
-    if text_type == text_type_text[0]:
-        return text_type_text[1]
-    if text_type == text_type_bold[0]:
-        return text_type_bold[1]
-    if text_type == text_type_italic[0]:
-        return text_type_italic[1]
-    if text_type == text_type_code[0]:
-        return text_type_code[1]
-    if text_type == text_type_link[0]:
-        return text_type_link[2]
-    if text_type == text_type_image[0]:
-        return text_type_image[2]
-    raise ValueError("Invalid text type.")
+    syntax = INLINE_SYNTAX.get(text_type)
+    if syntax is None:
+        raise ValueError("Invalid text type.")
+    return syntax[1]
 
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter:str, text_type:str) -> list[TextNode]:
     """Split nodes by delimiter."""
-    new_list = []
     if len(old_nodes)==0:
-        return new_list
-    
+        return []
     validate_delimiter_for_type(delimiter, text_type)
-
-    for node in old_nodes:
-        if node.text_type == text_type_text[0] and delimiter in node.text:
-            # split once on delimiter
-            split_text = node.text.split(delimiter, maxsplit=1)
-
-            if text_type == text_type_italic[0] and split_text[1][0] == delimiter:
-                # split was on bold, need to discard split and see if * (singular) is anywhere else
-                bold_split = node.text.split(delimiter*2)
-                split_text = []
-                split_text.append(f"{bold_split[0]}{delimiter*2}{bold_split[1]}{delimiter*2}")
-                split_text.extend(bold_split[2:])
-                if not delimiter in split_text[1]:
-                    # no italic in node
-                    new_list.append(node)
-                    continue
-                next_split = split_text[1].split(delimiter, maxsplit=1)
-                split_text[0] += next_split[0]
-                split_text[1] = next_split[1]
-                
-
-            closing_delimiter = set_closing_delimiter(text_type)
-            if not closing_delimiter in split_text[1]:
-                raise Exception("Closing Syntax not found. Invalid Markdown")
-            new_list.append(TextNode(split_text[0], text_type_text[0]))
-            next_split = split_text[1].split(closing_delimiter, maxsplit=1)
-            new_list.append(TextNode(next_split[0], text_type))
-            remaining_text=TextNode(next_split[1], text_type_text[0])
-            # recursively call for rest of text.
-            new_list.extend(split_nodes_delimiter([remaining_text], delimiter, text_type))
-        else:
-            new_list.append(node)
-    
-    return new_list
+    return split_delimiter(old_nodes, delimiter, text_type)
 
                 
 def extract_markdown_images(text:str) -> list[tuple]:
     """Extract image data from markdown."""
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text:str) -> list[tuple]:
     """Extract link data from markdown."""
-    return re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
+    return LINK_RE.findall(text)
 
 
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split nodes for links."""
-    new_list = []
-    if len(old_nodes)==0:
-        return new_list
-    for node in old_nodes:
-        if node.text_type == text_type_text[0] and text_type_link[1] in node.text:
-            extracted_links = extract_markdown_links(node.text)
-            if len(extracted_links) == 0:
-                # no links, continue
-                new_list.append(node)
-                continue
-            #else need to split text around each link
-            sections = node.text.split(f"[{extracted_links[0][0]}]({extracted_links[0][1]})")
-            new_list.append(TextNode(sections[0], text_type_text[0]))
-            new_list.append(TextNode(extracted_links[0][0], text_type_link[0], extracted_links[0][1]))
-            if len(sections[1]) > 0:
-                remaining_text=TextNode(sections[1], text_type_text[0])
-                # recursively call for rest of text.
-                new_list.extend(split_nodes_link([remaining_text]))
-        else:
-            new_list.append(node)
-    return new_list
+    return split_nodes_pattern(old_nodes, LINK_RE, text_type_link[1], text_type_link[0])
 
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split nodes for images."""
-    new_list = []
-    if len(old_nodes)==0:
-        return new_list
-    for node in old_nodes:
-        if node.text_type == text_type_text[0] and text_type_image[1] in node.text:
-            extracted_images = extract_markdown_images(node.text)
-            if len(extracted_images) == 0:
-                # no images, continue
-                new_list.append(node)
-                continue
-            # else need to split text around each link
-            sections = node.text.split(f"![{extracted_images[0][0]}]({extracted_images[0][1]})")
-            new_list.append(TextNode(sections[0], text_type_text[0]))
-            new_list.append(TextNode(extracted_images[0][0], text_type_image[0], extracted_images[0][1]))
-            if len(sections[1])> 0:
-                # recursively call for rest of text.
-                remaining_text=TextNode(sections[1], text_type_text[0])
-                new_list.extend(split_nodes_image([remaining_text]))
-        else:
-            new_list.append(node)
-    return new_list
+    return split_nodes_pattern(old_nodes, IMAGE_RE, text_type_image[1], text_type_image[0])
+
+
+def split_nodes_pattern(old_nodes: list[TextNode], pattern:re.Pattern, opening:str, text_type:str) -> list[TextNode]:
+    """Split text nodes around every (text, url) match of pattern."""
+    return split_pattern(old_nodes, pattern, opening, text_type)
+
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
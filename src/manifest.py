@@ -0,0 +1,138 @@
+"""Build manifest for incremental builds."""
+import hashlib
+import json
+import os
+
+GENERATOR_VERSION = "4"
+
+
+def hash_file(path:str) -> str:
+    """Return the sha256 hex digest of a file's content."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(65536), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class BuildManifest():
+    """Content hashes of the inputs used by the previous build.
+
+    Every page records the hash of its source and of each template and
+    partial it was rendered with, which makes up the dependency graph, and
+    the metadata collected while parsing it, which makes up the site index.
+    Listings map each section directory to the fingerprint and outputs of
+    its listing pages, feeds hold the same for the sitemap and Atom feed.
+    """
+
+    def __init__(self, path:str) -> None:
+        self.path = path
+        self.pages = {}
+        self.assets = {}
+        self.listings = {}
+        self.feeds = {}
+        self.seen = set()
+        self.load()
+
+    def load(self) -> None:
+        """Load the manifest from disk, starting empty if missing, corrupt or outdated."""
+        self.reset()
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("generator_version") != GENERATOR_VERSION:
+            return
+        self.pages = data.get("pages", {})
+        self.assets = data.get("assets", {})
+        self.listings = data.get("listings", {})
+        self.feeds = data.get("feeds", {})
+
+    def reset(self) -> None:
+        """Forget everything, forcing a full rebuild."""
+        self.pages = {}
+        self.assets = {}
+        self.listings = {}
+        self.feeds = {}
+        self.seen = set()
+
+    def is_empty(self) -> bool:
+        """True when there is no previous build to be incremental against."""
+        return len(self.pages) == 0 and len(self.assets) == 0
+
+    def stale_reason(self, source:str, source_hash:str, dest:str, deps:dict[str, str]|None=None) -> str|None:
+        """Return why source must be regenerated, or None if its output is up to date."""
+        entry = self.pages.get(source)
+        if entry is None:
+            return "new page"
+        if entry["hash"] != source_hash:
+            return "source changed"
+        if entry["output"] != dest:
+            return "output path changed"
+        previous = entry.get("deps", {})
+        for path, dep_hash in (deps or {}).items():
+            if path not in previous:
+                return f"now uses {path}"
+            if previous[path] != dep_hash:
+                return f"{path} changed"
+        for path in previous:
+            if path not in (deps or {}):
+                return f"no longer uses {path}"
+        if not os.path.exists(dest):
+            return "output missing"
+        return None
+
+    def check(self, source:str, source_hash:str, dest:str, deps:dict[str, str]|None=None) -> str|None:
+        """Mark source as part of this build and return why it must be regenerated, if it must."""
+        self.seen.add(source)
+        return self.stale_reason(source, source_hash, dest, deps)
+
+    def is_stale(self, source:str, source_hash:str, dest:str, deps:dict[str, str]|None=None) -> bool:
+        """Mark source as part of this build and return True if it must be regenerated."""
+        return self.check(source, source_hash, dest, deps) is not None
+
+    def record(self, source:str, source_hash:str, dest:str, deps:dict[str, str]|None=None, reason:str|None=None, meta:dict|None=None) -> None:
+        """Record a freshly generated page, its dependencies, why it was generated and its metadata."""
+        self.seen.add(source)
+        self.pages[source] = {"hash": source_hash, "output": dest, "deps": deps or {}, "reason": reason, "meta": meta or {}}
+
+    def site_index(self) -> dict[str, dict]:
+        """Return {source: metadata} for every page, with the page's output added as "output"."""
+        return {source: dict(entry.get("meta", {}), output=entry["output"]) for source, entry in sorted(self.pages.items())}
+
+    def dependents(self, path:str) -> list[str]:
+        """Return the sources of the pages that were rendered with the template or partial at path."""
+        return sorted(source for source, entry in self.pages.items() if path in entry.get("deps", {}))
+
+    def forget(self, source:str) -> str|None:
+        """Drop a page whose source was deleted, returning its output."""
+        entry = self.pages.pop(source, None)
+        return None if entry is None else entry["output"]
+
+    def prune(self) -> list[str]:
+        """Drop pages whose source was not seen this build, returning their outputs."""
+        removed = []
+        for source in list(self.pages):
+            if source not in self.seen:
+                removed.append(self.pages.pop(source)["output"])
+        return removed
+
+    def save(self) -> None:
+        """Write the manifest to disk atomically."""
+        directory = os.path.dirname(self.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "generator_version": GENERATOR_VERSION,
+            "pages": self.pages,
+            "assets": self.assets,
+            "listings": self.listings,
+            "feeds": self.feeds,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as manifest_file:
+            json.dump(data, manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
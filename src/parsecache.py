@@ -0,0 +1,79 @@
+"""On-disk cache of parsed pages across builds."""
+from manifest import GENERATOR_VERSION
+import json
+import os
+import shutil
+
+# bump when the rendered HTML of unchanged markdown changes.
+PARSE_CACHE_VERSION = f"{GENERATOR_VERSION}.2"
+
+
+class ParseCache():
+    """Rendered body HTML and metadata of markdown sources, one JSON file per source content hash.
+
+    Entries rendered under another asset URL map (url_digest) are misses.
+    """
+
+    def __init__(self, directory:str, url_digest:str|None=None) -> None:
+        self.directory = directory
+        self.url_digest = url_digest
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, source_hash:str) -> str:
+        return os.path.join(self.directory, source_hash[:2], f"{source_hash}.json")
+
+    def get(self, source_hash:str) -> tuple[dict, str]|None:
+        """Return (metadata, html) for the source hash, or None if missing, corrupt or outdated."""
+        entry = self.read(source_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def read(self, source_hash:str) -> tuple[dict, str]|None:
+        try:
+            with open(self.entry_path(source_hash), 'r', encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != PARSE_CACHE_VERSION or entry.get("urls") != self.url_digest:
+            return None
+        metadata = entry.get("meta")
+        html = entry.get("html")
+        if not isinstance(metadata, dict) or not isinstance(metadata.get("title"), str) or not isinstance(html, str):
+            return None
+        return metadata, html
+
+    def put(self, source_hash:str, metadata:dict, html:str) -> None:
+        """Store the parse result of a source atomically, so concurrent workers never see half an entry."""
+        path = self.entry_path(source_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as entry_file:
+            json.dump({"version": PARSE_CACHE_VERSION, "urls": self.url_digest, "meta": metadata, "html": html}, entry_file)
+        os.replace(tmp_path, path)
+
+    def prune(self, keep:set[str]) -> int:
+        """Delete entries whose source hash is not in keep, returning how many were removed."""
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        for prefix in os.listdir(self.directory):
+            prefix_dir = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.removesuffix(".json") in keep:
+                    continue
+                os.remove(os.path.join(prefix_dir, name))
+                removed += 1
+            if len(os.listdir(prefix_dir)) == 0:
+                os.rmdir(prefix_dir)
+        return removed
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
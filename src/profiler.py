@@ -0,0 +1,91 @@
+"""Per-stage and per-page build timing."""
+from contextlib import contextmanager, nullcontext
+import json
+import time
+
+
+class BuildProfiler():
+    """Accumulates wall and CPU time per build stage and per page."""
+    enabled = True
+
+    def __init__(self) -> None:
+        self.stages = {}
+        self.pages = {}
+
+    @contextmanager
+    def stage(self, name:str):
+        """Time the enclosed block as one call of stage name."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += time.perf_counter() - wall
+            totals[1] += time.process_time() - cpu
+            totals[2] += 1
+
+    @contextmanager
+    def page(self, path:str):
+        """Time the enclosed block as the generation of page path."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.pages[path] = [time.perf_counter() - wall, time.process_time() - cpu]
+
+    def to_dict(self) -> dict:
+        return {"stages": self.stages, "pages": self.pages}
+
+    def merge(self, data:dict) -> None:
+        """Add timings recorded by another profiler, e.g. in a worker process."""
+        for name, (wall, cpu, calls) in data["stages"].items():
+            totals = self.stages.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += calls
+        self.pages.update(data["pages"])
+
+    def report(self, top:int=10) -> str:
+        """Return a table of stages by wall time followed by the slowest pages."""
+        lines = [f"{'stage':<24} {'calls':>8} {'wall ms':>10} {'cpu ms':>10}"]
+        for name, (wall, cpu, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{name:<24} {calls:>8} {wall * 1000:>10.2f} {cpu * 1000:>10.2f}")
+        lines.append(f"slowest {min(top, len(self.pages))} of {len(self.pages)} page(s):")
+        for path, (wall, cpu) in sorted(self.pages.items(), key=lambda item: -item[1][0])[:top]:
+            lines.append(f"  {wall * 1000:>10.2f} ms wall {cpu * 1000:>10.2f} ms cpu  {path}")
+        return "\n".join(lines)
+
+    def write_json(self, path:str) -> None:
+        """Write the timings as JSON with stable key order so reports diff cleanly."""
+        with open(path, 'w', encoding="utf-8") as report_file:
+            json.dump(self.to_dict(), report_file, indent=1, sort_keys=True)
+
+
+class NullProfiler():
+    """Profiler used when profiling is off; every stage is a shared no-op context."""
+    enabled = False
+    _context = nullcontext()
+
+    def stage(self, name:str):
+        return self._context
+
+    def page(self, path:str):
+        return self._context
+
+
+_profiler = NullProfiler()
+
+
+def get_profiler() -> BuildProfiler|NullProfiler:
+    """Return the profiler of the current process."""
+    return _profiler
+
+
+def set_profiler(profiler:BuildProfiler|NullProfiler) -> BuildProfiler|NullProfiler:
+    """Install profiler for the current process, returning the previous one."""
+    global _profiler
+    previous = _profiler
+    _profiler = profiler
+    return previous
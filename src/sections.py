@@ -0,0 +1,80 @@
+"""Paginated listing pages for content sections, built from the site index."""
+from htmlnode import escape_attribute
+from typing import Iterator
+import hashlib
+import json
+import os
+
+# a content directory holding this template gets listing pages of its pages.
+LIST_TEMPLATE = "_list.html"
+
+
+def page_url(output:str, output_root:str) -> str:
+    """Return the site URL of an output file, ending index pages at their directory."""
+    prefix = os.path.join(output_root, "")
+    # outputs are joined onto the output root, so a prefix strip avoids relpath's normalization.
+    rel_path = output[len(prefix):] if output.startswith(prefix) else os.path.relpath(output, output_root)
+    rel_path = rel_path.replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return f"/{rel_path.removesuffix('index.html')}"
+    return f"/{rel_path}"
+
+
+def group_sections(index:dict[str, dict], content_dir:str) -> tuple[dict[str, list[dict]], dict[str, dict]]:
+    """Return ({directory: child pages}, {directory: its index page}) from the site index.
+
+    The children of a directory are its pages other than index pages, and
+    the index pages of its direct subdirectories.
+    """
+    content_root = os.path.abspath(content_dir)
+    children = {}
+    index_pages = {}
+    for source, meta in index.items():
+        directory = os.path.dirname(source)
+        if os.path.basename(meta["output"]) == "index.html":
+            index_pages[directory] = meta
+            parent = os.path.dirname(directory)
+            parent_root = os.path.abspath(parent)
+            if directory == parent or (parent_root != content_root and not parent_root.startswith(content_root + os.sep)):
+                continue
+            directory = parent
+        children.setdefault(directory, []).append(meta)
+    return children, index_pages
+
+
+def listing_output(section_out:str, number:int, has_index_page:bool) -> str:
+    """Output of listing page number, leaving <section>/index.html to a section's own index page."""
+    if number == 1 and not has_index_page:
+        return os.path.join(section_out, "index.html")
+    return os.path.join(section_out, "page", str(number), "index.html")
+
+
+def iter_entries_html(entries:list[dict], output_root:str) -> Iterator[str]:
+    """Yield the list of entries as HTML, one item at a time."""
+    yield '<ul class="section-list">'
+    for entry in entries:
+        date = entry.get("front_matter", {}).get("date")
+        date_html = "" if date is None else f' <time>{escape_attribute(str(date))}</time>'
+        yield f'<li><a href="{escape_attribute(page_url(entry["output"], output_root))}">{escape_attribute(entry["title"])}</a>{date_html}</li>'
+    yield "</ul>"
+
+
+def pagination_html(outputs:list[str], number:int, output_root:str) -> str:
+    """Return the previous/next navigation of listing page number (1-based)."""
+    links = []
+    if number > 1:
+        links.append(f'<a href="{escape_attribute(page_url(outputs[number - 2], output_root))}" rel="prev">Previous</a>')
+    links.append(f"<span>Page {number} of {len(outputs)}</span>")
+    if number < len(outputs):
+        links.append(f'<a href="{escape_attribute(page_url(outputs[number], output_root))}" rel="next">Next</a>')
+    return f'<nav class="pagination">{" ".join(links)}</nav>'
+
+
+def section_fingerprint(title:str, entries:list[dict], per_page:int, deps:dict[str, str]) -> str:
+    """Hash everything a section's listing pages are rendered from."""
+    hasher = hashlib.sha256(json.dumps([title, per_page, sorted(deps.items())]).encode())
+    for entry in entries:
+        hasher.update(f'{entry["output"]}\0{entry["title"]}\0{entry.get("front_matter", {}).get("date")}\n'.encode())
+    return hasher.hexdigest()
@@ -0,0 +1,43 @@
+"""Temporary site fixture shared by the build tests."""
+import os
+import tempfile
+import unittest
+from assets import set_asset_urls
+from buildlog import BuildLog, QUIET, set_log
+from main import parse_args
+
+
+class SiteTestCase(unittest.TestCase):
+    """A site in a temporary directory; subclasses add their flags and write their content in setUp."""
+    flags = ()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.args = parse_args([
+            "--quiet",
+            *self.flags,
+            "--content", os.path.join(root, "content"),
+            "--static", os.path.join(root, "static"),
+            "--template", os.path.join(root, "template.html"),
+            "--output", os.path.join(root, "public"),
+            "--cache-dir", os.path.join(root, ".cache"),
+            "--partials", os.path.join(root, "partials"),
+        ])
+        os.makedirs(self.args.content)
+        os.makedirs(self.args.static)
+        # main() installs the log --quiet asks for; the tests call build() directly.
+        self.previous_log = set_log(BuildLog(QUIET))
+
+    def tearDown(self):
+        set_log(self.previous_log)
+        set_asset_urls({})
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def read_output(self, *parts):
+        with open(os.path.join(self.args.output, *parts), encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,103 @@
+"""Compiled page templates."""
+from assets import asset_urls_digest, rewrite_asset_urls
+from typing import Iterator
+import os
+import re
+
+PLACEHOLDER_RE = re.compile(r"\{\{ (\w+) \}\}")
+PARTIAL_RE = re.compile(r"\{\{> ([\w./-]+) \}\}")
+
+
+class Template():
+    """Template pre-split into literal segments and named placeholder slots."""
+
+    def __init__(self, text:str, dependencies:list[str]|None=None) -> None:
+        # files the template was built from: itself followed by its partials.
+        self.dependencies = [] if dependencies is None else dependencies
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(text[position:])
+
+    @property
+    def placeholders(self) -> list[str]:
+        """Names of the placeholders in template order."""
+        return [name for _, name in self.slots]
+
+    def render(self, values:dict[str, str]) -> str:
+        """Fill the slots in a single join, leaving unknown placeholders untouched."""
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            if name in values:
+                parts[index] = values[name]
+        return "".join(parts)
+
+    def iter_render(self, values:dict) -> Iterator[str]:
+        """Yield the rendered page in chunks; values may be strings or iterables of strings."""
+        slots = dict(self.slots)
+        for index, part in enumerate(self.parts):
+            name = slots.get(index)
+            if name is None or name not in values:
+                yield part
+            elif isinstance(values[name], str):
+                yield values[name]
+            else:
+                yield from values[name]
+
+
+def partial_path(name:str, partials_dir:str) -> str:
+    return os.path.join(partials_dir, f"{name}.html")
+
+
+def expand_partials(text:str, partials_dir:str|None, dependencies:list[str], stack:tuple[str, ...]=()) -> str:
+    """Replace every {{> name }} with partials_dir/name.html, recursively, recording the files used."""
+    def include(match:re.Match) -> str:
+        name = match.group(1)
+        if partials_dir is None:
+            raise Exception(f"Partial {name} used without a partials directory.")
+        if name in stack:
+            raise Exception(f"Partial cycle: {' -> '.join(stack + (name,))}")
+        path = partial_path(name, partials_dir)
+        if not os.path.isfile(path):
+            raise Exception(f"Partial {name} not found at {path}.")
+        if path not in dependencies:
+            dependencies.append(path)
+        with open(path, 'r', encoding="utf-8") as partial_file:
+            return expand_partials(partial_file.read(), partials_dir, dependencies, stack + (name,))
+    return PARTIAL_RE.sub(include, text)
+
+
+def file_versions(paths:list[str]) -> tuple|None:
+    """Return (mtime_ns, size) of every path, or None if one has gone."""
+    versions = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        versions.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(versions)
+
+
+_template_cache = {}
+
+
+def load_template(template_path:str, partials_dir:str|None=None) -> Template:
+    """Return the compiled template with its partials and asset URLs rewritten.
+
+    It is only re-read when one of its files or the asset URL map changed.
+    """
+    cached = _template_cache.get((template_path, partials_dir))
+    if cached is not None and cached[1] == asset_urls_digest() and cached[0] == file_versions(cached[2].dependencies):
+        return cached[2]
+    dependencies = [template_path]
+    with open(template_path, 'r', encoding="utf-8") as template_file:
+        text = expand_partials(template_file.read(), partials_dir, dependencies)
+    template = Template(rewrite_asset_urls(text), dependencies)
+    _template_cache[(template_path, partials_dir)] = (file_versions(dependencies), asset_urls_digest(), template)
+    return template
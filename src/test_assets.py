@@ -0,0 +1,153 @@
+"""Unit test for static asset sync."""
+import os
+import tempfile
+import unittest
+from assets import asset_url, asset_urls, fingerprinted_path, get_asset_urls, keeps_name, rewrite_asset_urls, set_asset_urls, sync_files
+from manifest import BuildManifest, hash_file
+import json
+
+
+class TestSyncFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts), encoding="utf-8") as f:
+            return f.read()
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_files(self.static, self.public, self.manifest)
+        self.assertDictEqual(stats, {"copied": 2, "unchanged": 0, "removed": 0})
+        self.assertEqual(self.read("index.css"), "body {}")
+        self.assertEqual(self.read("images", "a.png"), "png")
+
+    def test_only_changed_assets_copied(self):
+        sync_files(self.static, self.public, self.manifest)
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        stats = sync_files(self.static, self.public, self.manifest)
+        self.assertDictEqual(stats, {"copied": 1, "unchanged": 1, "removed": 0})
+        self.assertEqual(self.read("index.css"), "body { color: red; }")
+
+    def test_deleted_assets_removed(self):
+        os.makedirs(self.public)
+        self.write(os.path.join(self.public, "index.html"), "page")
+        sync_files(self.static, self.public, self.manifest)
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        stats = sync_files(self.static, self.public, self.manifest)
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        # files not placed by the sync are left alone.
+        self.assertEqual(self.read("index.html"), "page")
+
+    def test_checksum_ignores_touch(self):
+        sync_files(self.static, self.public, self.manifest, checksum=True)
+        os.utime(os.path.join(self.static, "index.css"), ns=(0, 0))
+        stats = sync_files(self.static, self.public, self.manifest, checksum=True)
+        self.assertEqual(stats["copied"], 0)
+
+    def test_hardlink(self):
+        sync_files(self.static, self.public, self.manifest, link_mode="hardlink")
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.public, "index.css")))
+
+    def test_reflink_falls_back_to_copy(self):
+        sync_files(self.static, self.public, self.manifest, link_mode="reflink")
+        self.assertEqual(self.read("index.css"), "body {}")
+
+    def test_invalid_link_mode(self):
+        with self.assertRaisesRegex(ValueError, "Invalid link mode"):
+            sync_files(self.static, self.public, self.manifest, link_mode="symlink")
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.css = os.path.join(self.static, "index.css")
+        self.write(self.css, "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+
+    def tearDown(self):
+        set_asset_urls({})
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def css_name(self):
+        return fingerprinted_path("index.css", hash_file(self.css))
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("a", "b.min.js"), "0123456789ab"), os.path.join("a", "b.min.01234567.js"))
+        self.assertEqual(fingerprinted_path("LICENSE", "0123456789ab"), "LICENSE.01234567")
+
+    def test_places_fingerprinted_names_and_asset_manifest(self):
+        sync_files(self.static, self.public, self.manifest, fingerprint=True)
+        self.assertTrue(os.path.exists(os.path.join(self.public, self.css_name())))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        with open(os.path.join(self.public, "asset-manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["index.css"], self.css_name())
+        self.assertEqual(asset_urls(self.manifest)["/index.css"], f"/{self.css_name()}")
+
+    def test_fixed_urls_keep_their_names(self):
+        kept = ["robots.txt", "favicon.ico", "404.html", ".htaccess", os.path.join(".well-known", "security.txt")]
+        for rel_path in kept:
+            os.makedirs(os.path.dirname(os.path.join(self.static, rel_path)), exist_ok=True)
+            self.write(os.path.join(self.static, rel_path), rel_path)
+        sync_files(self.static, self.public, self.manifest, fingerprint=True)
+        for rel_path in kept:
+            with self.subTest(rel_path=rel_path):
+                self.assertTrue(keeps_name(rel_path))
+                self.assertTrue(os.path.exists(os.path.join(self.public, rel_path)))
+        self.assertFalse(keeps_name(os.path.join("css", "robots.css")))
+        # only the other assets are renamed and rewritten.
+        self.assertListEqual(sorted(asset_urls(self.manifest)), ["/images/a.png", "/index.css"])
+
+    def test_changed_asset_replaces_old_name(self):
+        sync_files(self.static, self.public, self.manifest, fingerprint=True)
+        old_name = self.css_name()
+        self.write(self.css, "body { color: red; }")
+        stats = sync_files(self.static, self.public, self.manifest, fingerprint=True)
+        self.assertDictEqual(stats, {"copied": 1, "unchanged": 1, "removed": 0})
+        self.assertNotEqual(self.css_name(), old_name)
+        self.assertFalse(os.path.exists(os.path.join(self.public, old_name)))
+        self.assertTrue(os.path.exists(os.path.join(self.public, self.css_name())))
+
+    def test_turning_off_restores_names(self):
+        sync_files(self.static, self.public, self.manifest, fingerprint=True)
+        sync_files(self.static, self.public, self.manifest)
+        self.assertListEqual(sorted(os.listdir(self.public)), ["images", "index.css"])
+        self.assertDictEqual(asset_urls(self.manifest), {})
+
+    def test_rewrites(self):
+        set_asset_urls({"/index.css": "/index.0123.css"})
+        self.assertEqual(asset_url("/index.css?v=1#top"), "/index.0123.css?v=1#top")
+        self.assertEqual(asset_url("/other.css"), "/other.css")
+        # relative URLs are not resolved against the page.
+        self.assertEqual(asset_url("index.css"), "index.css")
+        self.assertEqual(asset_url("../index.css"), "../index.css")
+        self.assertEqual(rewrite_asset_urls("""<link href="/index.css"><a href='/index.css'>x</a> href=/index.css"""),
+                         """<link href="/index.0123.css"><a href='/index.0123.css'>x</a> href=/index.css""")
+        set_asset_urls({})
+        self.assertDictEqual(get_asset_urls(), {})
+        self.assertEqual(asset_url("/index.css"), "/index.css")
+
+
+if __name__ == "__main__":
+    unittest.main()
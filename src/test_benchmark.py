@@ -0,0 +1,38 @@
+"""Unit test for the benchmark suite helpers."""
+import os
+import tempfile
+import unittest
+from benchmark import CORPUS_KINDS, write_corpus, read_pages, full_build, store_results, load_history, previous_timings
+
+
+class TestCorpus(unittest.TestCase):
+    def test_every_kind_builds(self):
+        for kind in CORPUS_KINDS:
+            with self.subTest(kind=kind), tempfile.TemporaryDirectory() as root:
+                write_corpus(root, kind, 0.01)
+                self.assertGreater(len(read_pages(os.path.join(root, "content"))), 0)
+                full_build(root)
+                self.assertTrue(os.path.exists(os.path.join(root, "public", "index.css")))
+
+    def test_unknown_kind(self):
+        with tempfile.TemporaryDirectory() as root:
+            with self.assertRaisesRegex(ValueError, "Unknown corpus kind"):
+                write_corpus(root, "nope", 1)
+
+
+class TestHistory(unittest.TestCase):
+    def test_store_and_compare(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench", "results.jsonl")
+            self.assertListEqual(load_history(path), [])
+            store_results(path, [{"name": "a", "seconds": 1.0}], 1.0)
+            store_results(path, [{"name": "a", "seconds": 2.0}], 0.5)
+            store_results(path, [{"name": "a", "seconds": 3.0}, {"name": "b", "seconds": 4.0}], 1.0)
+            history = load_history(path)
+            self.assertEqual(len(history), 3)
+            self.assertDictEqual(previous_timings(history, 1.0), {"a": 3.0, "b": 4.0})
+            self.assertDictEqual(previous_timings(history, 0.5), {"a": 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Unit test for the block HTML cache."""
+import unittest
+from blockcache import BlockCache, NullBlockCache, create_block_cache, entry_size, get_block_cache, set_block_cache
+from main import markdown_to_html, markdown_to_html_string, register_block_type
+from htmlnode import ParentNode
+import main
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache(1024 * 1024)
+        calls = []
+        render = lambda block: calls.append(block) or f"<p>{block}</p>"
+        self.assertEqual(cache.render("a", render), "<p>a</p>")
+        self.assertEqual(cache.render("b", render), "<p>b</p>")
+        self.assertEqual(cache.render("a", render), "<p>a</p>")
+        self.assertListEqual(calls, ["a", "b"])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(2 * entry_size("a", "<p>a</p>"))
+        render = lambda block: f"<p>{block}</p>"
+        cache.render("a", render)
+        cache.render("b", render)
+        cache.render("a", render)
+        cache.render("c", render)
+        self.assertListEqual(list(cache.entries), ["a", "c"])
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_oversized_block_not_stored(self):
+        cache = BlockCache(10)
+        self.assertEqual(cache.render("a", lambda block: "<p>a</p>"), "<p>a</p>")
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_disabled(self):
+        cache = create_block_cache(0)
+        self.assertIsInstance(cache, NullBlockCache)
+        self.assertEqual(cache.render("a", lambda block: "x"), "x")
+
+
+class TestRenderWithCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = BlockCache(1024 * 1024)
+        self.previous = set_block_cache(self.cache)
+
+    def tearDown(self):
+        set_block_cache(self.previous)
+
+    def test_output_unchanged(self):
+        markdown = "# Title\n\n- [a](/a)\n- b\n\nfooter *text*\n\n# Title\n\nfooter *text*"
+        expected = markdown_to_html(markdown).to_html()
+        self.assertEqual(markdown_to_html(markdown, self.cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_string(markdown, self.cache), expected)
+        self.assertEqual(self.cache.misses, 3)
+        self.assertEqual(self.cache.hits, 7)
+
+    def test_registering_block_type_clears(self):
+        markdown_to_html_string("---", self.cache)
+        register_block_type("thematic_break", lambda block: block == "---", lambda block: ParentNode("hr", [ParentNode("span", [])]), first_chars="-")
+        try:
+            self.assertIs(get_block_cache(), self.cache)
+            self.assertEqual(len(self.cache.entries), 0)
+        finally:
+            main.BLOCK_MATCHERS["-"] = [matcher for matcher in main.BLOCK_MATCHERS["-"] if matcher[0] != "thematic_break"]
+            del main.BLOCK_RENDERERS["thematic_break"]
+
+
+if __name__ == "__main__":
+    unittest.main()
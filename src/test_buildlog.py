@@ -0,0 +1,92 @@
+"""Unit test for build logging."""
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import tempfile
+import unittest
+from buildlog import BuildLog, QUIET, SUMMARY, VERBOSE, set_log
+from blockcache import get_block_cache, set_block_cache
+from main import main
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_levels(self):
+        for level, expected in ((QUIET, ""), (SUMMARY, "summary\n"), (VERBOSE, "detail\nsummary\n")):
+            stream = io.StringIO()
+            log = BuildLog(level, stream=stream)
+            log.info("detail")
+            log.summary("summary")
+            self.assertEqual(stream.getvalue(), expected)
+
+    def test_event_counts_and_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.jsonl")
+            log = BuildLog(QUIET, path)
+            log.event("page_generated", source="a.md")
+            log.event("page_generated", source="b.md")
+            log.event("asset_unchanged", count=3)
+            log.close()
+            self.assertDictEqual(log.counts, {"page_generated": 2, "asset_unchanged": 3})
+            with open(path, encoding="utf-8") as f:
+                events = [json.loads(line) for line in f]
+            self.assertListEqual([event["event"] for event in events], ["page_generated", "page_generated", "asset_unchanged"])
+            self.assertEqual(events[1]["source"], "b.md")
+            self.assertEqual(events[2]["count"], 3)
+
+
+class TestBuildOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        os.makedirs(os.path.join(root, "content"))
+        os.makedirs(os.path.join(root, "static"))
+        for path, text in (("content/index.md", "# Home"), ("static/index.css", "body {}"), ("template.html", "{{ Content }}")):
+            with open(os.path.join(root, path), 'w', encoding="utf-8") as f:
+                f.write(text)
+        self.argv = ["--content", os.path.join(root, "content"), "--static", os.path.join(root, "static"),
+                     "--template", os.path.join(root, "template.html"), "--output", os.path.join(root, "public"),
+                     "--cache-dir", os.path.join(root, ".cache")]
+        self.previous = set_log(BuildLog())
+        self.previous_cache = get_block_cache()
+
+    def tearDown(self):
+        set_log(self.previous)
+        set_block_cache(self.previous_cache)
+        self.tmp.cleanup()
+
+    def run_main(self, *extra):
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            main(self.argv + list(extra))
+        return stream.getvalue()
+
+    def test_default_prints_only_summary(self):
+        output = self.run_main()
+        self.assertEqual(len(output.strip().split("\n")), 1)
+        self.assertTrue(output.startswith("Built 1 page(s), 0 unchanged, 0 removed; assets 1 copied, 0 unchanged, 0 removed; block cache 0 hit(s), 1 miss(es) in "))
+
+    def test_block_cache_disabled(self):
+        output = self.run_main("--block-cache-mb", "0")
+        self.assertTrue(output.startswith("Built 1 page(s), 0 unchanged, 0 removed; assets 1 copied, 0 unchanged, 0 removed in "))
+
+    def test_quiet_prints_nothing(self):
+        self.assertEqual(self.run_main("--quiet"), "")
+
+    def test_verbose_prints_per_file(self):
+        self.assertIn("Generating page from", self.run_main("--verbose"))
+
+    def test_event_log(self):
+        events_path = os.path.join(self.tmp.name, "events.jsonl")
+        self.run_main("--quiet", "--log-json", events_path)
+        self.run_main("--quiet", "--log-json", events_path)
+        with open(events_path, encoding="utf-8") as f:
+            names = [json.loads(line)["event"] for line in f]
+        self.assertListEqual(names, [
+            "asset_copied", "assets_synced", "page_generated", "block_cache_miss", "parse_cache_miss", "build_finished",
+            "assets_synced", "page_unchanged", "build_finished",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
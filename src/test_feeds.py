@@ -0,0 +1,85 @@
+"""Unit test for the sitemap and Atom feed."""
+import os
+import unittest
+from xml.etree import ElementTree
+from feeds import atom_date, iter_sitemap, sitemap_outputs
+from manifest import BuildManifest
+from main import build, generate_feeds
+from sitetest import SiteTestCase
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+class TestHelpers(unittest.TestCase):
+    def test_iter_sitemap_escapes(self):
+        xml = "".join(iter_sitemap([("https://example.com/?a=1&b=2", "2024-01-01"), ("https://example.com/x", None)]))
+        root = ElementTree.fromstring(xml)
+        self.assertListEqual([url.findtext(f"{SITEMAP_NS}loc") for url in root], ["https://example.com/?a=1&b=2", "https://example.com/x"])
+        self.assertListEqual([url.findtext(f"{SITEMAP_NS}lastmod") for url in root], ["2024-01-01", None])
+
+    def test_sitemap_outputs(self):
+        self.assertListEqual(sitemap_outputs("out", 3, 3), [os.path.join("out", "sitemap.xml")])
+        self.assertListEqual(sitemap_outputs("out", 4, 3), [os.path.join("out", name) for name in ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml"]])
+
+    def test_atom_date(self):
+        self.assertEqual(atom_date("2024-01-01"), "2024-01-01T00:00:00Z")
+        self.assertEqual(atom_date("2024-01-01T10:00:00+02:00"), "2024-01-01T10:00:00+02:00")
+
+
+class TestGenerateFeeds(SiteTestCase):
+    flags = ("--base-url", "https://example.com/")
+
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.args.content, "blog"))
+        self.write(self.args.template, "{{ Title }}|{{ Content }}")
+        self.write(os.path.join(self.args.content, "index.md"), "# Home & away")
+        self.write(os.path.join(self.args.content, "blog", "a.md"), "---\ndate: 2024-01-01\n---\n# Post a")
+        self.write(os.path.join(self.args.content, "blog", "b.md"), "---\ndate: 2024-03-01\n---\n# Post b")
+        build(self.args)
+
+    def output(self, name):
+        return os.path.join(self.args.output, name)
+
+    def manifest(self):
+        return BuildManifest(os.path.join(self.args.cache_dir, "manifest.json"))
+
+    def test_sitemap(self):
+        root = ElementTree.parse(self.output("sitemap.xml")).getroot()
+        self.assertListEqual([url.findtext(f"{SITEMAP_NS}loc") for url in root], [
+            "https://example.com/blog/a.html",
+            "https://example.com/blog/b.html",
+            "https://example.com/",
+        ])
+
+    def test_feed_newest_first(self):
+        root = ElementTree.parse(self.output("feed.xml")).getroot()
+        self.assertEqual(root.findtext(f"{ATOM_NS}title"), "Home & away")
+        self.assertEqual(root.findtext(f"{ATOM_NS}updated"), "2024-03-01T00:00:00Z")
+        self.assertListEqual([entry.findtext(f"{ATOM_NS}title") for entry in root.iter(f"{ATOM_NS}entry")], ["Post b", "Post a"])
+
+    def test_unchanged_pages_not_rewritten(self):
+        os.utime(self.output("sitemap.xml"), ns=(0, 0))
+        self.write(os.path.join(self.args.content, "blog", "a.md"), "---\ndate: 2024-01-01\n---\n# Post a\n\nnew body")
+        build(self.args)
+        self.assertEqual(os.stat(self.output("sitemap.xml")).st_mtime_ns, 0)
+        self.write(os.path.join(self.args.content, "blog", "a.md"), "---\ndate: 2024-05-01\n---\n# Post a")
+        build(self.args)
+        self.assertNotEqual(os.stat(self.output("sitemap.xml")).st_mtime_ns, 0)
+
+    def test_shards_and_removal(self):
+        manifest = self.manifest()
+        self.assertEqual(generate_feeds(manifest, self.args.output, self.args.base_url, sitemap_limit=2), 4)
+        root = ElementTree.parse(self.output("sitemap.xml")).getroot()
+        self.assertListEqual([sitemap.findtext(f"{SITEMAP_NS}loc") for sitemap in root], [
+            "https://example.com/sitemap-1.xml",
+            "https://example.com/sitemap-2.xml",
+        ])
+        self.assertEqual(len(ElementTree.parse(self.output("sitemap-2.xml")).getroot()), 1)
+        self.assertEqual(generate_feeds(manifest, self.args.output, None), 0)
+        self.assertListEqual(sorted(name for name in os.listdir(self.args.output) if name.endswith(".xml")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
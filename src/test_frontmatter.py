@@ -0,0 +1,79 @@
+"""Unit test for page front matter."""
+import os
+import tempfile
+import unittest
+from frontmatter import is_draft, parse_value, read_front_matter, split_front_matter
+
+
+class TestParseValue(unittest.TestCase):
+    def test_scalars(self):
+        self.assertEqual(parse_value(" plain text "), "plain text")
+        self.assertEqual(parse_value('"a \\"quoted\\" string"'), 'a "quoted" string')
+        self.assertEqual(parse_value("'literal \\n'"), "literal \\n")
+        self.assertIs(parse_value("true"), True)
+        self.assertIs(parse_value("false"), False)
+        self.assertEqual(parse_value("-12"), -12)
+        self.assertEqual(parse_value("2024-05-01"), "2024-05-01")
+
+    def test_list(self):
+        self.assertListEqual(parse_value('[a, "b, c", 3, ]'), ["a", "b, c", 3])
+        self.assertListEqual(parse_value("[]"), [])
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_yaml_style(self):
+        front_matter, body = split_front_matter("---\ntitle: Hello: world\n# a comment\ndraft: true\n---\n# Body\n\n---\n")
+        self.assertDictEqual(front_matter, {"title": "Hello: world", "draft": True})
+        self.assertEqual(body, "\n# Body\n\n---\n")
+
+    def test_toml_style(self):
+        front_matter, body = split_front_matter('+++\r\ntitle = "Hi"\r\ntags = ["a", "b"]\r\n+++\r\nbody')
+        self.assertDictEqual(front_matter, {"title": "Hi", "tags": ["a", "b"]})
+        self.assertEqual(body.strip(), "body")
+
+    def test_no_front_matter(self):
+        self.assertTupleEqual(split_front_matter("# Title\n---\n"), ({}, "# Title\n---\n"))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "Unclosed front matter."):
+            split_front_matter("---\ntitle: x\n")
+        with self.assertRaisesRegex(ValueError, "Invalid front matter line"):
+            split_front_matter("---\nno separator\n---\n")
+        with self.assertRaisesRegex(ValueError, "Invalid front matter value"):
+            split_front_matter('---\ntitle: "bad \\q"\n---\n')
+
+
+class TestReadFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def test_matches_split(self):
+        text = "---\ntitle: T\ndraft: false\n---\n# Body"
+        self.write(text)
+        self.assertDictEqual(read_front_matter(self.path), split_front_matter(text)[0])
+        self.assertFalse(is_draft(read_front_matter(self.path)))
+
+    def test_no_front_matter(self):
+        self.write("# Title\n\n---\n")
+        self.assertDictEqual(read_front_matter(self.path), {})
+
+    def test_unclosed(self):
+        self.write("+++\ndraft = true\n")
+        with self.assertRaisesRegex(ValueError, "Unclosed front matter."):
+            read_front_matter(self.path)
+
+    def test_draft(self):
+        self.write("+++\ndraft = true\n+++\n")
+        self.assertTrue(is_draft(read_front_matter(self.path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 """Unit test for html node."""
+import io
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -159,4 +160,72 @@ class TestParentNode(unittest.TestCase):
     def test_repr(self):
         expected = "ParentNode(tag, [], {'a': 'b'})"
         node = ParentNode(tag="tag", children=[], props={"a":"b"})
-        self.assertEqual(expected, node.__repr__())
\ No newline at end of file
+        self.assertEqual(expected, node.__repr__())
+
+
+class TestProps(unittest.TestCase):
+    def test_values_escaped(self):
+        node = LeafNode("a", "x", {"href": "/search?q=a&b=\"c\"", "title": "<it's>"})
+        self.assertEqual(node.to_html(), '<a href="/search?q=a&amp;b=&quot;c&quot;" title="&lt;it&#x27;s&gt;">x</a>')
+
+    def test_props_not_copied(self):
+        props = {"a": "b"}
+        node = LeafNode("p", "x", props)
+        self.assertIs(node.props, props)
+        self.assertEqual(node.to_html(), '<p a="b">x</p>')
+        props["a"] = "c"
+        self.assertEqual(node.to_html(), '<p a="c">x</p>')
+
+    def test_cache_invalidated_on_change(self):
+        node = LeafNode("a", "x", {"href": "/one"})
+        self.assertEqual(node.props_to_html(), 'href="/one"')
+        node.props["href"] = "/two"
+        self.assertEqual(node.props_to_html(), 'href="/two"')
+        node.props.update(rel="next")
+        self.assertEqual(node.props_to_html(), 'href="/two" rel="next"')
+        del node.props["href"]
+        self.assertEqual(node.props_to_html(), 'rel="next"')
+        node.props.clear()
+        self.assertEqual(node.to_html(), "<a>x</a>")
+        node.props = {"id": "new"}
+        self.assertEqual(node.to_html(), '<a id="new">x</a>')
+
+    def test_cache_invalidated_on_equal_values_of_another_type(self):
+        node = LeafNode("a", "x", {"v": 1})
+        self.assertEqual(node.props_to_html(), 'v="1"')
+        node.props["v"] = True
+        self.assertEqual(node.props_to_html(), 'v="True"')
+        node.props["v"] = 1.0
+        self.assertEqual(node.props_to_html(), 'v="1.0"')
+
+
+class TestStreamingHTML(unittest.TestCase):
+    def build_tree(self):
+        return ParentNode("div", [
+            LeafNode("p", "I am a paragraph", {"href": "www.test.com"}),
+            ParentNode("div", [LeafNode("p", "I am a child paragraph")], {"href": "www.test.com"}),
+            LeafNode(None, "I am a raw"),
+        ])
+
+    def test_iter_html_matches_to_html(self):
+        node = self.build_tree()
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_write(self):
+        node = self.build_tree()
+        output = io.StringIO()
+        node.write(output)
+        self.assertEqual(output.getvalue(), node.to_html())
+
+    def test_iter_html_errors(self):
+        self.assertRaises(NotImplementedError, lambda: list(HTMLNode().iter_html()))
+        with self.assertRaisesRegex(ValueError, "Expected Children."):
+            list(ParentNode("div", [ParentNode("p", [])]).iter_html())
+        with self.assertRaisesRegex(ValueError, "Value has not been set."):
+            list(LeafNode("p", None).iter_html())
+
+    def test_slots(self):
+        for node in (HTMLNode(), LeafNode("p", "v"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
@@ -0,0 +1,83 @@
+"""Unit test for the inline tokenizer."""
+import unittest
+import inline
+from inline import tokenize_inline, iter_inline, inline_to_html, register_inline_type
+from htmlnode import LeafNode
+from textnode import INLINE_RENDERERS, text_node_to_html_node
+from benchmark import chained_text_to_textnodes, inline_paragraph
+from textnode import TextNode
+
+
+class TestTokenizeInline(unittest.TestCase):
+    def assertSameAsChained(self, text):
+        expected = chained_text_to_textnodes(text)
+        result = tokenize_inline(text)
+        self.assertListEqual(result, expected)
+        self.assertListEqual([node.url for node in result], [node.url for node in expected])
+
+    def test_plain_text(self):
+        self.assertListEqual(tokenize_inline("just text"), [TextNode("just text", "text")])
+        self.assertListEqual(tokenize_inline(""), [TextNode("", "text")])
+
+    def test_matches_chained_passes(self):
+        cases = [
+            "This is **text** with an *italic* word and a `code block` and an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)",
+            "**bold** at the start",
+            "ends with *italic*",
+            "[link](a)[link](b) back to back",
+            "![img](a)![img](b)",
+            "[link](a)![img](b)",
+            "![img](a)[link](b)",
+            "[link](a)**bold**",
+            "`code`![img](a)",
+            "brackets [without] a link and ! marks",
+            "![not an image] then [a](b)",
+            "Step [1] of the guide: ![diagram](/images/d.png)",
+            "Use [`x`] then see [docs](/d)",
+            "[`b[x](u)` ",
+            "[a *b](c)* d",
+            "[a **b](c)** [d](e)",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertSameAsChained(text)
+
+    def test_generated_paragraph(self):
+        self.assertSameAsChained(inline_paragraph(200))
+
+    def test_unclosed_delimiter(self):
+        for text in ["a **bold", "an *italic", "a `code"]:
+            with self.assertRaisesRegex(Exception, "Closing Syntax not found. Invalid Markdown"):
+                tokenize_inline(text)
+
+    def test_large_paragraph_does_not_recurse(self):
+        tokens = list(iter_inline(inline_paragraph(20000)))
+        self.assertEqual(len([token for token in tokens if token[0] != "text"]), 20000)
+
+
+class TestRegisterInlineType(unittest.TestCase):
+    def setUp(self):
+        register_inline_type("strikethrough", "~~", lambda node: LeafNode("s", node.text))
+
+    def tearDown(self):
+        del inline.DELIMITERS["~~"]
+        del inline.INLINE_SYNTAX["strikethrough"]
+        del INLINE_RENDERERS["strikethrough"]
+
+    def test_tokenized_and_rendered(self):
+        nodes = tokenize_inline("this is ~~gone~~ and **bold**")
+        self.assertListEqual(nodes, [
+            TextNode("this is ", "text"),
+            TextNode("gone", "strikethrough"),
+            TextNode(" and ", "text"),
+            TextNode("bold", "bold"),
+            TextNode("", "text"),
+        ])
+        self.assertEqual(text_node_to_html_node(nodes[1]).to_html(), "<s>gone</s>")
+
+    def test_direct_html_uses_renderer(self):
+        self.assertEqual(inline_to_html("this is ~~gone~~ and **bold**"), "this is <s>gone</s> and <b>bold</b>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
 """Unit test main."""
+import os
+import tempfile
+import time
 import unittest
-from main import split_nodes_delimiter, set_closing_delimiter, validate_delimiter_for_type, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, populate_html_node_for_block, strip_markdown_syntax, get_heading_count, populate_html_node_for_list_blocks, markdown_to_html, extract_title
+import main
+from main import register_block_type, discover_pages, generate_pages_recursive, parse_args, build, rebuild_changed, split_nodes_delimiter, set_closing_delimiter, validate_delimiter_for_type, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, populate_html_node_for_block, strip_markdown_syntax, get_heading_count, populate_html_node_for_list_blocks, markdown_to_html, extract_title
 from textnode import TextNode
-from htmlnode import ParentNode
+from htmlnode import LeafNode, ParentNode
+from assets import fingerprinted_path
+from manifest import hash_file
+from sitetest import SiteTestCase
 
 class TestSetClosingDelimiter(unittest.TestCase):
     def test_set_text(self):
@@ -430,6 +437,24 @@ block 3 - irgsiogsoiengs
                     "block 3 - irgsiogsoiengs"]
         self.assertListEqual(markdown_to_blocks(text), expected)
 
+    def test_fenced_code_keeps_blank_lines(self):
+        text = "para\n\n```python\ndef f():\n\n    return 1\n```\n\nafter"
+        expected = ["para", "```python\ndef f():\n\n    return 1\n```", "after"]
+        self.assertListEqual(markdown_to_blocks(text), expected)
+
+    def test_fence_closed_on_one_line(self):
+        self.assertListEqual(markdown_to_blocks("```code```\n\nnext"), ["```code```", "next"])
+
+    def test_unclosed_fence_splits_on_blank_lines(self):
+        text = "```\ncode\n\nmore\n\n> quote"
+        self.assertListEqual(markdown_to_blocks(text), ["```\ncode", "more", "> quote"])
+
+    def test_inline_code_on_first_line_is_not_a_fence(self):
+        text = "```x``` is inline code\n\nsecond para\n\n```\ncode\n```"
+        self.assertListEqual(markdown_to_blocks(text), ["```x``` is inline code", "second para", "```\ncode\n```"])
+        self.assertEqual(markdown_to_html(text).to_html(),
+                         "<div><p><code></code><code>x</code><code></code> is inline code</p><p>second para</p><pre><code>code</code></pre></div>")
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_is_paragraph(self):
         text_block = "this is text block"
@@ -708,6 +733,10 @@ Neither is this.            """
         expected = "I am a title"
         self.assertEqual(expected, extract_title(test_str))
 
+    def test_title_after_first_line(self):
+        self.assertEqual("Title", extract_title("intro\n## Sub\n#not\n# Title  \n# Second"))
+        self.assertEqual("", extract_title("text\n# "))
+
     def test_exception(self):
         with self.assertRaisesRegex(Exception, "No Header found in text."):
             extract_title("")
@@ -719,4 +748,333 @@ Neither is this.            """
             test_str = """I am not a title
 This is not,
 Neither is this.            """
-            extract_title(test_str)
\ No newline at end of file
+            extract_title(test_str)
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_collects_headings_words_and_links(self):
+        metadata = main.new_page_metadata("Title")
+        markdown = "# Title\n\nSee [the docs](/docs) and ![a cat](/cat.png).\n\n## It's well-known\n\n```\ncode here\n```"
+        html = markdown_to_html(markdown, metadata=metadata).to_html()
+        self.assertEqual(html, markdown_to_html(markdown).to_html())
+        self.assertDictEqual(metadata, {
+            "title": "Title",
+            "front_matter": {},
+            "headings": [[1, "Title"], [2, "It's well-known"]],
+            "words": 11,
+            "links": ["/docs"],
+        })
+
+    def test_direct_renderer_collects_the_same(self):
+        markdown = "# A\n\n- [x](/x)\n- y\n\n### B"
+        tree = main.new_page_metadata("A")
+        direct = main.new_page_metadata("A")
+        markdown_to_html(markdown, metadata=tree).to_html()
+        "".join(main.iter_markdown_html(markdown, metadata=direct))
+        self.assertDictEqual(tree, direct)
+
+
+class TestGeneratePagesRecursive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        for index, section in enumerate(["a", "b", os.path.join("b", "c")]):
+            os.makedirs(os.path.join(self.content, section))
+            with open(os.path.join(self.content, section, "index.md"), 'w', encoding="utf-8") as f:
+                f.write(f"# Page {index}\n\nSome *text* here.")
+        with open(self.template, 'w', encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, root):
+        tree = {}
+        for _, dest in discover_pages(self.content, root):
+            with open(dest, encoding="utf-8") as f:
+                tree[os.path.relpath(dest, root)] = f.read()
+        return tree
+
+    def test_discover_pages_sorted(self):
+        pages = discover_pages(self.content, "out")
+        self.assertListEqual([dest for _, dest in pages], [
+            os.path.join("out", "a", "index.html"),
+            os.path.join("out", "b", "c", "index.html"),
+            os.path.join("out", "b", "index.html"),
+        ])
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, parallel, jobs=2)
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_direct_renderer_matches_tree(self):
+        tree = os.path.join(self.tmp.name, "tree")
+        direct = os.path.join(self.tmp.name, "direct")
+        generate_pages_recursive(self.content, self.template, tree)
+        generate_pages_recursive(self.content, self.template, direct, renderer="direct")
+        self.assertDictEqual(self.read_tree(tree), self.read_tree(direct))
+
+    def test_failure_names_source_file(self):
+        bad_path = os.path.join(self.content, "b", "index.md")
+        with open(bad_path, 'w', encoding="utf-8") as f:
+            f.write("no title here")
+        with self.assertRaisesRegex(Exception, "b.index.md: Exception: No Header found in text."):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.tmp.name, "out"), jobs=2)
+
+
+class TestRebuildChanged(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.args.content, "a"))
+        self.write(os.path.join(self.args.content, "index.md"), "# Home")
+        self.write(os.path.join(self.args.content, "a", "index.md"), "# A")
+        self.write(os.path.join(self.args.static, "index.css"), "body {}")
+        self.write(self.args.template, "{{ Title }}|{{ Content }}")
+        build(self.args)
+
+    def test_front_matter_title_and_drafts(self):
+        page = os.path.join(self.args.content, "a", "index.md")
+        self.write(page, "---\ntitle: From front matter\ntags: [x, y]\n---\n# A")
+        rebuild_changed({os.path.abspath(page)}, self.args)
+        self.assertEqual(self.read_output("a", "index.html"), "From front matter|<div><h1>A</h1></div>")
+        self.assertListEqual(self.site_index()[page]["front_matter"]["tags"], ["x", "y"])
+
+        self.write(page, "+++\ndraft = true\n+++\n# A")
+        rebuild_changed({os.path.abspath(page)}, self.args)
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "a", "index.html")))
+        self.assertNotIn(page, self.site_index())
+
+        self.args.drafts = True
+        build(self.args)
+        self.assertEqual(self.read_output("a", "index.html"), "A|<div><h1>A</h1></div>")
+
+    def test_invalid_front_matter_fails_page(self):
+        page = os.path.join(self.args.content, "a", "index.md")
+        self.write(page, "---\ntitle: x\n# A")
+        with self.assertRaisesRegex(Exception, "index.md: ValueError: Unclosed front matter."):
+            rebuild_changed({os.path.abspath(page)}, self.args)
+
+    def test_changed_page_only(self):
+        page = os.path.join(self.args.content, "a", "index.md")
+        self.write(page, "# A changed")
+        os.utime(os.path.join(self.args.output, "index.html"), ns=(0, 0))
+        summary = rebuild_changed({os.path.abspath(page)}, self.args)
+        self.assertEqual(summary, "Rebuilt 1 page(s)")
+        self.assertTrue(self.read_output("a", "index.html").startswith("A changed|"))
+        self.assertEqual(os.stat(os.path.join(self.args.output, "index.html")).st_mtime_ns, 0)
+
+    def site_index(self):
+        return main.BuildManifest(os.path.join(self.args.cache_dir, "manifest.json")).site_index()
+
+    def test_site_index(self):
+        page = os.path.join(self.args.content, "a", "index.md")
+        self.assertEqual(self.site_index()[page]["title"], "A")
+        self.write(page, "# A changed\n\n[home](/)")
+        rebuild_changed({os.path.abspath(page)}, self.args)
+        self.assertDictEqual(self.site_index()[page], {
+            "title": "A changed",
+            "front_matter": {},
+            "headings": [[1, "A changed"]],
+            "words": 3,
+            "links": ["/"],
+            "output": os.path.join(self.args.output, "a", "index.html"),
+        })
+        # a template change re-renders from the parse cache and keeps the metadata.
+        self.write(self.args.template, "new {{ Title }}|{{ Content }}")
+        rebuild_changed({os.path.abspath(self.args.template)}, self.args)
+        self.assertEqual(self.site_index()[page]["links"], ["/"])
+
+    def test_new_directory_and_deleted_page(self):
+        os.makedirs(os.path.join(self.args.content, "b"))
+        new_page = os.path.join(self.args.content, "b", "index.md")
+        self.write(new_page, "# B")
+        old_page = os.path.join(self.args.content, "a", "index.md")
+        os.remove(old_page)
+        changed = {os.path.abspath(os.path.dirname(new_page)), os.path.abspath(old_page)}
+        self.assertEqual(rebuild_changed(changed, self.args), "Rebuilt 1 page(s), removed 1 page(s)")
+        self.assertTrue(self.read_output("b", "index.html").startswith("B|"))
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "a", "index.html")))
+
+    def test_static_change(self):
+        css = os.path.join(self.args.static, "index.css")
+        self.write(css, "body { color: red; }")
+        self.assertEqual(rebuild_changed({os.path.abspath(css)}, self.args), "Rebuilt 1 asset(s)")
+        self.assertEqual(self.read_output("index.css"), "body { color: red; }")
+
+    def test_template_change_rebuilds_dependents(self):
+        self.write(self.args.template, "<h1>{{ Title }}</h1>")
+        self.assertEqual(rebuild_changed({os.path.abspath(self.args.template)}, self.args), "Rebuilt 2 page(s)")
+        self.assertEqual(self.read_output("a", "index.html"), "<h1>A</h1>")
+
+    def test_directory_template_rebuilds_pages_below(self):
+        directory_template = os.path.join(self.args.content, "a", "_template.html")
+        self.write(directory_template, "a: {{ Title }}")
+        self.assertEqual(rebuild_changed({os.path.abspath(directory_template)}, self.args), "Rebuilt 1 page(s)")
+        self.assertEqual(self.read_output("a", "index.html"), "a: A")
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "a", "_template.html")))
+        os.remove(directory_template)
+        self.assertEqual(rebuild_changed({os.path.abspath(directory_template)}, self.args), "Rebuilt 1 page(s)")
+        self.assertTrue(self.read_output("a", "index.html").startswith("A|"))
+
+    def test_partial_change_rebuilds_pages_using_it(self):
+        os.makedirs(self.args.partials)
+        partial = os.path.join(self.args.partials, "footer.html")
+        self.write(partial, "footer 1")
+        directory_template = os.path.join(self.args.content, "a", "_template.html")
+        self.write(directory_template, "{{ Title }}|{{> footer }}")
+        rebuild_changed({os.path.abspath(directory_template)}, self.args)
+        self.write(partial, "footer 2")
+        self.assertEqual(rebuild_changed({os.path.abspath(partial)}, self.args), "Rebuilt 1 page(s)")
+        self.assertEqual(self.read_output("a", "index.html"), "A|footer 2")
+
+        why = main.why_rebuilt(parse_args(["why-rebuilt", os.path.join(self.args.output, "a", "index.html"), "--cache-dir", self.args.cache_dir,
+                                           "--content", self.args.content, "--template", self.args.template, "--partials", self.args.partials]))
+        self.assertIn(f"last rebuilt: {partial} changed", why)
+        self.assertIn(f"depends on {partial}", why)
+        self.assertIn("next build: up to date", why)
+        self.assertIn(f"{partial} is used by 1 page(s)", main.why_rebuilt(parse_args(["why-rebuilt", partial, "--cache-dir", self.args.cache_dir])))
+
+    def test_front_matter_template(self):
+        page = os.path.join(self.args.content, "a", "index.md")
+        special = os.path.join(self.args.content, "a", "_special.html")
+        self.write(special, "special: {{ Title }}")
+        self.write(page, "---\ntemplate: _special.html\n---\n# A")
+        self.assertEqual(rebuild_changed({os.path.abspath(page)}, self.args), "Rebuilt 1 page(s)")
+        self.assertEqual(self.read_output("a", "index.html"), "special: A")
+
+        why = main.why_rebuilt(parse_args(["why-rebuilt", os.path.join(self.args.output, "a", "index.html"), "--cache-dir", self.args.cache_dir,
+                                           "--content", self.args.content, "--template", self.args.template]))
+        self.assertIn(f"depends on {special}", why)
+        self.assertIn("next build: up to date", why)
+
+        self.write(special, "special 2: {{ Title }}")
+        self.assertEqual(rebuild_changed({os.path.abspath(special)}, self.args), "Rebuilt 1 page(s)")
+        self.assertEqual(self.read_output("a", "index.html"), "special 2: A")
+
+        self.write(page, "---\ntemplate: _missing.html\n---\n# A")
+        with self.assertRaisesRegex(Exception, "_missing.html not found"):
+            rebuild_changed({os.path.abspath(page)}, self.args)
+
+
+class TestFingerprintedAssets(SiteTestCase):
+    flags = ("--fingerprint",)
+
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.args.static, "images"))
+        self.css = os.path.join(self.args.static, "index.css")
+        self.png = os.path.join(self.args.static, "images", "a.png")
+        self.write(self.css, "body {}")
+        self.write(self.png, "png")
+        self.write(self.args.template, '<link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.args.content, "index.md"), "# Home\n\n![a](/images/a.png) [css](/index.css#x) [page](/page.html)")
+
+    def expected(self):
+        css = fingerprinted_path("index.css", hash_file(self.css))
+        png = fingerprinted_path("images/a.png", hash_file(self.png))
+        return (f'<link href="/{css}"><div><h1>Home</h1><p><img src="/{png}" alt="a"></img> '
+                f'<a href="/{css}#x">css</a> <a href="/page.html">page</a></p></div>')
+
+    def test_references_rewritten_by_both_renderers(self):
+        for renderer in main.RENDERERS:
+            with self.subTest(renderer=renderer):
+                self.args.renderer = renderer
+                self.args.full = True
+                build(self.args)
+                self.assertEqual(self.read_output("index.html"), self.expected())
+
+    def test_changed_asset_rebuilds_pages(self):
+        build(self.args)
+        self.write(self.css, "body { color: red; }")
+        summary = rebuild_changed({os.path.abspath(self.css)}, self.args)
+        self.assertEqual(summary, "Rebuilt 1 asset(s), 1 page(s)")
+        self.assertEqual(self.read_output("index.html"), self.expected())
+
+
+class TestRegisterBlockType(unittest.TestCase):
+    def setUp(self):
+        register_block_type("thematic_break", lambda block: block == "---", lambda block: ParentNode("hr", [LeafNode(None, "")]), first_chars="-")
+
+    def tearDown(self):
+        main.BLOCK_MATCHERS["-"] = [matcher for matcher in main.BLOCK_MATCHERS["-"] if matcher[0] != "thematic_break"]
+        del main.BLOCK_RENDERERS["thematic_break"]
+
+    def test_detected_and_rendered(self):
+        self.assertEqual(block_to_block_type("---"), "thematic_break")
+        self.assertEqual(block_to_block_type("- item"), "unordered_list")
+        self.assertEqual(markdown_to_html("a\n\n---\n\nb").to_html(), "<div><p>a</p><hr></hr><p>b</p></div>")
+
+    def test_direct_renderer_falls_back_to_tree(self):
+        self.assertEqual(main.markdown_to_html_string("a\n\n---\n\nb"), "<div><p>a</p><hr></hr><p>b</p></div>")
+
+    def test_unknown_block_type(self):
+        with self.assertRaisesRegex(ValueError, "Invalid block type."):
+            populate_html_node_for_block("nope", "text")
+
+
+class TestDirectRenderer(unittest.TestCase):
+    def test_matches_tree(self):
+        documents = [
+            "# Title\n\npara with **bold**, *italic*, `code`, [a link](/x) and ![img](/i.png)",
+            "## Sub\n\n> quoted *text*\n> more\n\n- one\n* two\n\n1. first\n2. [second](/2)",
+            "```\ncode\n\nblock\n```\n\n###### small",
+            "[a & b](/q?x=1&y=\"2\") ![it's <here>](/i.png?a=1&b=2)",
+        ]
+        for markdown in documents:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(main.markdown_to_html_string(markdown), markdown_to_html(markdown).to_html())
+
+    def test_empty_document(self):
+        with self.assertRaisesRegex(ValueError, "Expected Children."):
+            main.markdown_to_html_string("\n\n")
+
+    def test_invalid_markdown(self):
+        with self.assertRaisesRegex(Exception, "Closing Syntax not found. Invalid Markdown"):
+            main.markdown_to_html_string("some **bold")
+
+
+class TestLargeInlineInput(unittest.TestCase):
+    def test_100k_link_paragraph(self):
+        text = " ".join(f"see [link {i}](/page/{i})" for i in range(100000))
+        start = time.perf_counter()
+        response = split_nodes_link([TextNode(text, "text")])
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(len(response), 200000)
+        self.assertEqual(response[-1], TextNode("link 99999", "link"))
+        self.assertEqual(response[-1].url, "/page/99999")
+
+    def test_100k_image_paragraph(self):
+        text = " ".join(f"see ![image {i}](/img/{i}.png)" for i in range(100000))
+        start = time.perf_counter()
+        response = split_nodes_image([TextNode(text, "text")])
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(len(response), 200000)
+
+    def test_100k_delimiter_paragraph(self):
+        text = " ".join(f"some **bold {i}** and *italic {i}*" for i in range(100000))
+        start = time.perf_counter()
+        response = split_nodes_delimiter([TextNode(text, "text")], "**", "bold")
+        response = split_nodes_delimiter(response, "*", "italic")
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(len(response), 400001)
+
+    def test_link_matching_image_text_not_split_inside_image(self):
+        response = split_nodes_link([TextNode("![a](b) and [a](b)", "text")])
+        self.assertListEqual(response, [
+            TextNode("![a](b) and ", "text"),
+            TextNode("a", "link", "b"),
+        ])
+
+    def test_repeated_link_keeps_all_text(self):
+        response = split_nodes_link([TextNode("[a](b) and [a](b) end", "text")])
+        self.assertListEqual(response, [
+            TextNode("", "text"),
+            TextNode("a", "link", "b"),
+            TextNode(" and ", "text"),
+            TextNode("a", "link", "b"),
+            TextNode(" end", "text"),
+        ])
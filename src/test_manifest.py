@@ -0,0 +1,127 @@
+"""Unit test for build manifest."""
+import os
+import tempfile
+import unittest
+from manifest import BuildManifest, hash_file, GENERATOR_VERSION
+from main import generate_pages_recursive, remove_stale_pages
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_empty_when_missing(self):
+        manifest = BuildManifest(self.path)
+        self.assertTrue(manifest.is_empty())
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.path)
+        manifest.record("a.md", "h", "a.html", {"t.html": "t"}, "new page", {"title": "A"})
+        manifest.save()
+
+        loaded = BuildManifest(self.path)
+        self.assertDictEqual(loaded.pages, {"a.md": {"hash": "h", "output": "a.html", "deps": {"t.html": "t"}, "reason": "new page", "meta": {"title": "A"}}})
+        self.assertDictEqual(loaded.site_index(), {"a.md": {"title": "A", "output": "a.html"}})
+
+    def test_corrupt_or_old_version_is_empty(self):
+        with open(self.path, 'w') as manifest_file:
+            manifest_file.write("{not json")
+        self.assertTrue(BuildManifest(self.path).is_empty())
+
+        with open(self.path, 'w') as manifest_file:
+            manifest_file.write('{"generator_version": "0", "template_hash": "t", "pages": {}}')
+        self.assertTrue(BuildManifest(self.path).is_empty())
+        self.assertNotEqual("0", GENERATOR_VERSION)
+
+    def test_dependency_changes_make_page_stale(self):
+        manifest = BuildManifest(self.path)
+        output = os.path.join(self.tmp.name, "a.html")
+        open(output, 'w').close()
+        manifest.record("a.md", "h", output, {"t.html": "t1", "p.html": "p1"})
+        self.assertIsNone(manifest.stale_reason("a.md", "h", output, {"t.html": "t1", "p.html": "p1"}))
+        self.assertEqual(manifest.stale_reason("a.md", "h2", output, {"t.html": "t1", "p.html": "p1"}), "source changed")
+        self.assertEqual(manifest.stale_reason("a.md", "h", output, {"t.html": "t1", "p.html": "p2"}), "p.html changed")
+        self.assertEqual(manifest.stale_reason("a.md", "h", output, {"t.html": "t1"}), "no longer uses p.html")
+        self.assertEqual(manifest.stale_reason("a.md", "h", output, {"u.html": "u", "p.html": "p1"}), "now uses u.html")
+        self.assertEqual(manifest.stale_reason("b.md", "h", output, {}), "new page")
+        self.assertListEqual(manifest.dependents("p.html"), ["a.md"])
+
+    def test_prune_returns_unseen_outputs(self):
+        manifest = BuildManifest(self.path)
+        manifest.record("a.md", "h", "a.html")
+        manifest.record("b.md", "h", "b.html")
+        manifest.save()
+
+        manifest = BuildManifest(self.path)
+        manifest.is_stale("a.md", "h", "a.html")
+        self.assertListEqual(manifest.prune(), ["b.html"])
+        self.assertListEqual(list(manifest.pages), ["a.md"])
+
+    def test_hash_file(self):
+        file_path = os.path.join(self.tmp.name, "f.txt")
+        with open(file_path, 'w') as f:
+            f.write("abc")
+        self.assertEqual(hash_file(file_path), "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad")
+
+
+class TestIncrementalGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "sub"))
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "sub", "index.md"), "# Sub")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.manifest_path = os.path.join(root, "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self):
+        manifest = BuildManifest(self.manifest_path)
+        generate_pages_recursive(self.content, self.template, self.public, manifest)
+        remove_stale_pages(manifest)
+        manifest.save()
+
+    def mtime(self, *parts):
+        return os.stat(os.path.join(self.public, *parts)).st_mtime_ns
+
+    def test_only_changed_pages_rewritten(self):
+        self.build()
+        sub_mtime = self.mtime("sub", "index.html")
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        self.write(os.path.join(self.content, "index.md"), "# Home changed")
+        self.build()
+        self.assertNotEqual(self.mtime("index.html"), 0)
+        self.assertEqual(self.mtime("sub", "index.html"), sub_mtime)
+        with open(os.path.join(self.public, "index.html"), encoding="utf-8") as f:
+            self.assertIn("Home changed", f.read())
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        os.utime(os.path.join(self.public, "sub", "index.html"), ns=(0, 0))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertNotEqual(self.mtime("sub", "index.html"), 0)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "sub", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sub", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Unit test for the on-disk parse cache."""
+import json
+import os
+import tempfile
+import unittest
+from parsecache import ParseCache, PARSE_CACHE_VERSION
+from manifest import hash_file
+from main import build
+from sitetest import SiteTestCase
+import main
+
+HASH = "ab" * 32
+META = {"title": "Title", "headings": [], "words": 1, "links": []}
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "pages"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get(HASH))
+        self.cache.put(HASH, META, "<div>body</div>")
+        self.assertTupleEqual(self.cache.get(HASH), (META, "<div>body</div>"))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put(HASH, META, "<div>body</div>")
+        with open(self.cache.entry_path(HASH), 'w', encoding="utf-8") as f:
+            f.write('{"version": "')
+        self.assertIsNone(self.cache.get(HASH))
+
+    def test_version_mismatch_is_a_miss(self):
+        self.cache.put(HASH, META, "<div>body</div>")
+        with open(self.cache.entry_path(HASH), 'w', encoding="utf-8") as f:
+            json.dump({"version": PARSE_CACHE_VERSION + "-old", "meta": META, "html": "<div>body</div>"}, f)
+        self.assertIsNone(self.cache.get(HASH))
+
+    def test_prune(self):
+        other = "cd" * 32
+        self.cache.put(HASH, {"title": "A"}, "a")
+        self.cache.put(other, {"title": "B"}, "b")
+        self.assertEqual(self.cache.prune({HASH}), 1)
+        self.assertIsNotNone(self.cache.get(HASH))
+        self.assertFalse(os.path.exists(os.path.dirname(self.cache.entry_path(other))))
+
+
+class TestTemplateOnlyRebuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = os.path.join(self.args.content, "index.md")
+        self.write(self.page, "# Home\n\nbody")
+        self.write(self.args.template, "{{ Title }}|{{ Content }}")
+        build(self.args)
+        self.cache = ParseCache(os.path.join(self.args.cache_dir, "pages"))
+        self.source_hash = hash_file(self.page)
+
+    def test_template_change_reuses_parse(self):
+        meta = {"title": "Home", "front_matter": {}, "headings": [[1, "Home"]], "words": 2, "links": []}
+        self.assertTupleEqual(self.cache.get(self.source_hash), (meta, "<div><h1>Home</h1><p>body</p></div>"))
+        # a marker only the cache can produce proves the page was not parsed again.
+        self.cache.put(self.source_hash, {"title": "Cached"}, "<div>cached</div>")
+        self.write(self.args.template, "new {{ Title }}|{{ Content }}")
+        build(self.args)
+        self.assertEqual(self.read_output("index.html"), "new Cached|<div>cached</div>")
+
+    def test_pages_stream_with_the_cache(self):
+        written = []
+        output_html = main.output_html
+        main.output_html = lambda path, html: written.append(isinstance(html, str)) or output_html(path, html)
+        try:
+            self.write(self.page, "# Home\n\nnew body")
+            build(self.args)
+            self.write(self.args.template, "new {{ Title }}|{{ Content }}")
+            build(self.args)
+        finally:
+            main.output_html = output_html
+        # a parsed page and a cache hit are both written as chunks.
+        self.assertListEqual(written, [False, False])
+        self.assertEqual(self.cache.get(hash_file(self.page))[1], "<div><h1>Home</h1><p>new body</p></div>")
+        self.assertEqual(self.read_output("index.html"), "new Home|<div><h1>Home</h1><p>new body</p></div>")
+
+    def test_corrupt_cache_falls_back_to_parse(self):
+        self.write(self.cache.entry_path(self.source_hash), "not json")
+        self.write(self.args.template, "new {{ Title }}|{{ Content }}")
+        build(self.args)
+        self.assertEqual(self.read_output("index.html"), "new Home|<div><h1>Home</h1><p>body</p></div>")
+
+    def test_stale_entries_pruned(self):
+        self.write(self.page, "# Changed")
+        build(self.args)
+        self.assertIsNone(self.cache.get(self.source_hash))
+        self.assertIsNotNone(self.cache.get(hash_file(self.page)))
+
+
+if __name__ == "__main__":
+    unittest.main()
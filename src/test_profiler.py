@@ -0,0 +1,105 @@
+"""Unit test for build profiling."""
+import json
+import os
+import tempfile
+import unittest
+from profiler import BuildProfiler, NullProfiler, get_profiler, set_profiler
+from blockcache import BlockCache, NullBlockCache, set_block_cache
+from main import generate_pages_recursive
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_stage_accumulates(self):
+        profiler = BuildProfiler()
+        for _ in range(3):
+            with profiler.stage("parse"):
+                pass
+        wall, cpu, calls = profiler.stages["parse"]
+        self.assertEqual(calls, 3)
+        self.assertGreaterEqual(wall, 0)
+        self.assertGreaterEqual(cpu, 0)
+
+    def test_stage_records_on_error(self):
+        profiler = BuildProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.stage("parse"):
+                raise ValueError("boom")
+        self.assertEqual(profiler.stages["parse"][2], 1)
+
+    def test_merge(self):
+        profiler = BuildProfiler()
+        profiler.stages["parse"] = [1.0, 0.5, 2]
+        profiler.merge({"stages": {"parse": [1.0, 0.5, 1], "write": [0.1, 0.1, 1]}, "pages": {"a.md": [1.0, 1.0]}})
+        self.assertListEqual(profiler.stages["parse"], [2.0, 1.0, 3])
+        self.assertListEqual(profiler.stages["write"], [0.1, 0.1, 1])
+        self.assertDictEqual(profiler.pages, {"a.md": [1.0, 1.0]})
+
+    def test_report_lists_slowest_pages_first(self):
+        profiler = BuildProfiler()
+        profiler.pages = {"fast.md": [0.001, 0.001], "slow.md": [0.5, 0.4], "mid.md": [0.1, 0.1]}
+        lines = profiler.report(top=2).split("\n")
+        self.assertEqual(lines[1], "slowest 2 of 3 page(s):")
+        self.assertTrue(lines[2].endswith("slow.md"))
+        self.assertTrue(lines[3].endswith("mid.md"))
+
+    def test_null_profiler_is_default(self):
+        self.assertIsInstance(get_profiler(), NullProfiler)
+        self.assertFalse(get_profiler().enabled)
+        with get_profiler().stage("anything"):
+            pass
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def test_pages_and_stages_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, f"{name}.md"), 'w', encoding="utf-8") as f:
+                    f.write(f"# {name}\n\nSome **text**.")
+            template = os.path.join(tmp, "template.html")
+            with open(template, 'w', encoding="utf-8") as f:
+                f.write("{{ Content }}")
+
+            for jobs in (1, 2):
+                profiler = BuildProfiler()
+                previous = set_profiler(profiler)
+                # cached blocks skip the stages checked below.
+                previous_cache = set_block_cache(NullBlockCache())
+                try:
+                    generate_pages_recursive(content, template, os.path.join(tmp, f"public{jobs}"), jobs=jobs)
+                finally:
+                    set_profiler(previous)
+                    set_block_cache(previous_cache)
+                self.assertSetEqual(set(profiler.pages), {os.path.join(content, "a.md"), os.path.join(content, "b.md")})
+                for stage in ("file read", "markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "to_html", "template substitution", "write"):
+                    self.assertGreater(profiler.stages[stage][2], 0, stage)
+
+                report_path = os.path.join(tmp, "profile.json")
+                profiler.write_json(report_path)
+                with open(report_path, encoding="utf-8") as f:
+                    self.assertSetEqual(set(json.load(f)), {"stages", "pages"})
+
+    def test_block_cache_times_block_to_html(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "a.md"), 'w', encoding="utf-8") as f:
+                f.write("# a\n\nSome **text**.\n\n- one\n- two")
+            template = os.path.join(tmp, "template.html")
+            with open(template, 'w', encoding="utf-8") as f:
+                f.write("{{ Content }}")
+            profiler = BuildProfiler()
+            previous = set_profiler(profiler)
+            previous_cache = set_block_cache(BlockCache(1024 * 1024))
+            try:
+                generate_pages_recursive(content, template, os.path.join(tmp, "public"))
+            finally:
+                set_profiler(previous)
+                set_block_cache(previous_cache)
+            # one call per freshly rendered block plus the page's own join.
+            self.assertEqual(profiler.stages["to_html"][2], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
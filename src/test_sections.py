@@ -0,0 +1,88 @@
+"""Unit test for section listing pages."""
+import os
+import unittest
+from sections import group_sections, listing_output, page_url, pagination_html
+from main import build, rebuild_changed
+from sitetest import SiteTestCase
+
+
+class TestHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("out", "index.html"), "out"), "/")
+        self.assertEqual(page_url(os.path.join("out", "blog", "index.html"), "out"), "/blog/")
+        self.assertEqual(page_url(os.path.join("out", "blog", "post.html"), "out"), "/blog/post.html")
+
+    def test_group_sections(self):
+        content = "content"
+        index = {
+            os.path.join(content, "index.md"): {"output": os.path.join("out", "index.html")},
+            os.path.join(content, "blog", "index.md"): {"output": os.path.join("out", "blog", "index.html")},
+            os.path.join(content, "blog", "a.md"): {"output": os.path.join("out", "blog", "a.html")},
+            os.path.join(content, "blog", "old", "index.md"): {"output": os.path.join("out", "blog", "old", "index.html")},
+        }
+        children, index_pages = group_sections(index, content)
+        self.assertListEqual([entry["output"] for entry in children[os.path.join(content, "blog")]], [
+            os.path.join("out", "blog", "a.html"),
+            os.path.join("out", "blog", "old", "index.html"),
+        ])
+        self.assertListEqual([entry["output"] for entry in children[content]], [os.path.join("out", "blog", "index.html")])
+        self.assertSetEqual(set(index_pages), {content, os.path.join(content, "blog"), os.path.join(content, "blog", "old")})
+
+    def test_listing_output(self):
+        self.assertEqual(listing_output("s", 1, False), os.path.join("s", "index.html"))
+        self.assertEqual(listing_output("s", 1, True), os.path.join("s", "page", "1", "index.html"))
+        self.assertEqual(listing_output("s", 3, False), os.path.join("s", "page", "3", "index.html"))
+
+    def test_pagination(self):
+        outputs = [os.path.join("out", "index.html"), os.path.join("out", "page", "2", "index.html")]
+        self.assertEqual(pagination_html(outputs, 1, "out"), '<nav class="pagination"><span>Page 1 of 2</span> <a href="/page/2/" rel="next">Next</a></nav>')
+        self.assertEqual(pagination_html(outputs, 2, "out"), '<nav class="pagination"><a href="/" rel="prev">Previous</a> <span>Page 2 of 2</span></nav>')
+
+
+class TestListingPages(SiteTestCase):
+    flags = ("--per-page", "2")
+
+    def setUp(self):
+        super().setUp()
+        self.blog = os.path.join(self.args.content, "blog")
+        os.makedirs(self.blog)
+        self.write(self.args.template, "{{ Title }}|{{ Content }}")
+        self.write(os.path.join(self.blog, "_list.html"), "{{ Title }}|{{ Content }}|{{ Pagination }}")
+        for name, date in [("a", "2024-01-01"), ("b", "2024-03-01"), ("c", None)]:
+            front_matter = "" if date is None else f"---\ndate: {date}\n---\n"
+            self.write(os.path.join(self.blog, f"{name}.md"), f"{front_matter}# Post {name}")
+        build(self.args)
+
+    def test_paginated_newest_first(self):
+        self.assertEqual(self.read_output("blog", "index.html"),
+            'blog|<ul class="section-list"><li><a href="/blog/b.html">Post b</a> <time>2024-03-01</time></li>'
+            '<li><a href="/blog/a.html">Post a</a> <time>2024-01-01</time></li></ul>'
+            '|<nav class="pagination"><span>Page 1 of 2</span> <a href="/blog/page/2/" rel="next">Next</a></nav>')
+        self.assertIn('<li><a href="/blog/c.html">Post c</a></li>', self.read_output("blog", "page", "2", "index.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "page")))
+
+    def test_unchanged_section_not_rewritten(self):
+        listing = os.path.join(self.args.output, "blog", "index.html")
+        os.utime(listing, ns=(0, 0))
+        build(self.args)
+        self.assertEqual(os.stat(listing).st_mtime_ns, 0)
+
+    def test_index_page_titles_listing_and_extra_pages_removed(self):
+        index = os.path.join(self.blog, "index.md")
+        self.write(index, "# The blog")
+        os.remove(os.path.join(self.blog, "c.md"))
+        summary = rebuild_changed({os.path.abspath(index), os.path.abspath(os.path.join(self.blog, "c.md"))}, self.args)
+        self.assertEqual(summary, "Rebuilt 1 page(s), 1 listing page(s), removed 1 page(s)")
+        self.assertEqual(self.read_output("blog", "index.html"), "The blog|<div><h1>The blog</h1></div>")
+        self.assertTrue(self.read_output("blog", "page", "1", "index.html").startswith("The blog|"))
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "blog", "page", "2", "index.html")))
+
+    def test_removing_list_template_removes_listings(self):
+        os.remove(os.path.join(self.blog, "_list.html"))
+        build(self.args)
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "blog", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.args.output, "blog", "page", "2", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
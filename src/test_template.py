@@ -0,0 +1,94 @@
+"""Unit test for compiled templates."""
+import os
+import tempfile
+import unittest
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_matches_str_replace(self):
+        text = "<title> {{ Title }} </title>\n<article>{{ Content }}</article>"
+        template = Template(text)
+        expected = text.replace("{{ Title }}", "A title").replace("{{ Content }}", "<p>body</p>")
+        self.assertEqual(template.render({"Title": "A title", "Content": "<p>body</p>"}), expected)
+
+    def test_placeholders(self):
+        template = Template("{{ A }}-{{ B }}-{{ A }}")
+        self.assertListEqual(template.placeholders, ["A", "B", "A"])
+        self.assertEqual(template.render({"A": "1", "B": "2"}), "1-2-1")
+
+    def test_unknown_placeholder_left_untouched(self):
+        template = Template("{{ Title }} {{ Missing }} {{not_a_slot}}")
+        self.assertEqual(template.render({"Title": "t"}), "t {{ Missing }} {{not_a_slot}}")
+
+    def test_iter_render_streams_iterables(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}{{ Other }}")
+        chunks = template.iter_render({"Title": "t", "Content": iter(["<p>", "x", "</p>"])})
+        self.assertEqual("".join(chunks), "<title>t</title><p>x</p>{{ Other }}")
+
+    def test_no_placeholders(self):
+        self.assertEqual(Template("plain").render({"Title": "t"}), "plain")
+
+    def test_load_template_cached_until_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w', encoding="utf-8") as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+            with open(path, 'w', encoding="utf-8") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(load_template(path).render({"Title": "t"}), "<h1>t</h1>")
+
+
+
+class TestPartials(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.partials = os.path.join(self.tmp.name, "partials")
+        os.makedirs(os.path.join(self.partials, "nav"))
+        self.template = os.path.join(self.tmp.name, "template.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def test_nested_partials_and_dependencies(self):
+        self.write(self.template, "<header>{{> header }}</header>{{ Content }}")
+        self.write(os.path.join(self.partials, "header.html"), "{{ Title }} {{> nav/links }}")
+        self.write(os.path.join(self.partials, "nav", "links.html"), "<a>home</a>")
+        template = load_template(self.template, self.partials)
+        self.assertEqual(template.render({"Title": "t", "Content": "c"}), "<header>t <a>home</a></header>c")
+        self.assertListEqual(template.dependencies, [
+            self.template,
+            os.path.join(self.partials, "header.html"),
+            os.path.join(self.partials, "nav", "links.html"),
+        ])
+
+    def test_reloaded_when_partial_changes(self):
+        partial = os.path.join(self.partials, "footer.html")
+        self.write(self.template, "{{> footer }}")
+        self.write(partial, "one")
+        self.assertEqual(load_template(self.template, self.partials).render({}), "one")
+        self.write(partial, "two!")
+        self.assertEqual(load_template(self.template, self.partials).render({}), "two!")
+
+    def test_missing_partial(self):
+        self.write(self.template, "{{> nope }}")
+        with self.assertRaisesRegex(Exception, "Partial nope not found"):
+            load_template(self.template, self.partials)
+
+    def test_cycle(self):
+        self.write(self.template, "{{> a }}")
+        self.write(os.path.join(self.partials, "a.html"), "{{> b }}")
+        self.write(os.path.join(self.partials, "b.html"), "{{> a }}")
+        with self.assertRaisesRegex(Exception, "Partial cycle: a -> b -> a"):
+            load_template(self.template, self.partials)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 """Unit test for text node."""
 import unittest
 from htmlnode import LeafNode
-from textnode import TextNode, text_node_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -136,5 +136,26 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         with self.assertRaisesRegex(Exception, "Text type does not match expected types."):
             text_node_to_html_node(test_node)
 
+
+class TestCompactTextNode(unittest.TestCase):
+    def test_slots(self):
+        node = TextNode("text", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test_text_type_enum(self):
+        node = TextNode("text", "bold")
+        self.assertIs(node.text_type, TextType.BOLD)
+        self.assertEqual(node.text_type, "bold")
+        self.assertIs(TextNode("text", TextType.LINK, "url").text_type, TextType.LINK)
+        self.assertEqual(repr(node), "TextNode(text, bold, None)")
+
+    def test_unknown_text_type_kept(self):
+        node = TextNode("text", "normal")
+        self.assertEqual(node.text_type, "normal")
+        self.assertRaises(Exception, text_node_to_html_node, node)
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
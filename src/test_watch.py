@@ -0,0 +1,83 @@
+"""Unit test for file watching."""
+import os
+import tempfile
+import time
+import unittest
+from watch import InotifyWatcher, PollingWatcher, create_watcher
+
+
+class WatcherTests():
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content, "sub"))
+        self.page = os.path.join(self.content, "sub", "index.md")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.page, "# Page")
+        self.write(self.template, "{{ Content }}")
+        self.watcher = self.create([self.content, self.template])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def test_no_changes(self):
+        self.assertSetEqual(self.watcher.poll(0.1), set())
+
+    def test_modified_file(self):
+        self.write(self.page, "# Page changed")
+        self.assertIn(self.page, self.watcher.poll(2))
+
+    def test_created_and_deleted_file(self):
+        new_page = os.path.join(self.content, "new.md")
+        self.write(new_page, "# New")
+        self.assertIn(new_page, self.watcher.poll(2))
+        os.remove(new_page)
+        self.assertIn(new_page, self.watcher.poll(2))
+
+    def test_watched_single_file(self):
+        self.write(os.path.join(self.tmp.name, "unrelated.txt"), "x")
+        self.write(self.template, "<p>{{ Content }}</p>")
+        changed = self.watcher.poll(2)
+        self.assertIn(self.template, changed)
+        self.assertNotIn(os.path.join(self.tmp.name, "unrelated.txt"), changed)
+
+
+class TestPollingWatcher(WatcherTests, unittest.TestCase):
+    def create(self, roots):
+        watcher = PollingWatcher(roots, interval=0.01)
+        # make sure the next write lands on a different mtime.
+        time.sleep(0.01)
+        return watcher
+
+
+class TestInotifyWatcher(WatcherTests, unittest.TestCase):
+    def create(self, roots):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            self.skipTest("inotify not available")
+
+    def test_new_directory_is_watched(self):
+        new_dir = os.path.join(self.content, "new")
+        os.mkdir(new_dir)
+        self.watcher.poll(2)
+        new_page = os.path.join(new_dir, "index.md")
+        self.write(new_page, "# New")
+        self.assertIn(new_page, self.watcher.poll(2))
+
+
+class TestCreateWatcher(unittest.TestCase):
+    def test_returns_a_watcher(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = create_watcher([tmp])
+            self.assertIsInstance(watcher, (InotifyWatcher, PollingWatcher))
+            watcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
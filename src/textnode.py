@@ -1,11 +1,33 @@
 """Text node class."""
-from htmlnode import LeafNode
+from htmlnode import LeafNode, escape_attribute
+from blockcache import get_block_cache
+from assets import asset_url
+from enum import Enum
+from typing import Callable
+
+class TextType(str, Enum):
+    """Inline text types. Members compare equal to their string values."""
+    TEXT = "text"
+    BOLD = "bold"
+    ITALIC = "italic"
+    CODE = "code"
+    LINK = "link"
+    IMAGE = "image"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+TEXT_TYPES = {text_type.value: text_type for text_type in TextType}
+
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text:str, text_type:str, url:str=None) -> None:
         self.text = text
-        self.text_type = text_type
+        # known types are stored as the shared enum member; unknown ones are kept as given.
+        self.text_type = TEXT_TYPES.get(text_type, text_type)
         self.url = url
 
     def __eq__(self, node)->bool:
@@ -16,26 +38,48 @@ class TextNode():
     def __repr__(self) -> str:
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
     
+INLINE_RENDERERS = {
+    TextType.TEXT: lambda node: LeafNode(tag=None, value=node.text),
+    TextType.BOLD: lambda node: LeafNode(tag="b", value=node.text),
+    TextType.ITALIC: lambda node: LeafNode(tag="i", value=node.text),
+    TextType.CODE: lambda node: LeafNode(tag="code", value=node.text),
+    TextType.LINK: lambda node: LeafNode(tag="a", value=node.text, props={"href": asset_url(node.url)}),
+    TextType.IMAGE: lambda node: LeafNode(tag="img", value="", props={"src": asset_url(node.url), "alt": node.text}),
+}
+
+
+# text type -> function(text, url) returning the same HTML as the LeafNode
+# above, for the direct renderer that skips building nodes.
+INLINE_HTML = {
+    TextType.TEXT: lambda text, url: text,
+    TextType.BOLD: lambda text, url: f"<b>{text}</b>",
+    TextType.ITALIC: lambda text, url: f"<i>{text}</i>",
+    TextType.CODE: lambda text, url: f"<code>{text}</code>",
+    TextType.LINK: lambda text, url: f'<a href="{escape_attribute(asset_url(url))}">{text}</a>',
+    TextType.IMAGE: lambda text, url: f'<img src="{escape_attribute(asset_url(url))}" alt="{escape_attribute(text)}"></img>',
+}
+
+
+def register_text_type(text_type:str, renderer:Callable[[TextNode], LeafNode]) -> None:
+    """Register how TextNodes of a new (or overridden) text type become LeafNodes."""
+    text_type = TEXT_TYPES.get(text_type, text_type)
+    INLINE_RENDERERS[text_type] = renderer
+    # the direct renderer falls back to renderer for this type.
+    INLINE_HTML.pop(text_type, None)
+    get_block_cache().clear()
+
+
 def text_node_to_html_node(text_node:TextNode) -> LeafNode:
     """Transform text node to Leaf HTML Node."""
-    text_type_text = "text"
-    text_type_bold = "bold"
-    text_type_italic = "italic"
-    text_type_code = "code"
-    text_type_link = "link"
-    text_type_image = "image"
-
-    if text_node.text_type == text_type_text:
-        return LeafNode(tag=None, value=text_node.text)
-    if text_node.text_type == text_type_bold:
-        return LeafNode(tag="b", value=text_node.text)
-    if text_node.text_type == text_type_italic:
-        return LeafNode(tag="i", value=text_node.text)
-    if text_node.text_type == text_type_code:
-        return LeafNode(tag="code", value=text_node.text)
-    if text_node.text_type == text_type_link:
-        return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
-    if text_node.text_type == text_type_image:
-        return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
-    raise Exception("Text type does not match expected types.")
-    
\ No newline at end of file
+    renderer = INLINE_RENDERERS.get(text_node.text_type)
+    if renderer is None:
+        raise Exception("Text type does not match expected types.")
+    return renderer(text_node)
+
+
+def text_to_html(text_type:str, text:str, url:str|None=None) -> str:
+    """Render one inline token straight to HTML, as its LeafNode would."""
+    render = INLINE_HTML.get(text_type)
+    if render is None:
+        return text_node_to_html_node(TextNode(text, text_type, url)).to_html()
+    return render(text, url)
@@ -0,0 +1,208 @@
+"""File watching and a development HTTP server."""
+from buildlog import get_log
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+# inotify event masks, see inotify(7).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+# Further events arriving within this window are folded into the same rebuild.
+DEBOUNCE_SECONDS = 0.05
+
+
+def split_roots(roots:list[str]) -> tuple[list[str], set[str]]:
+    """Split watch roots into directories watched recursively and single files."""
+    directories = []
+    files = set()
+    for root in roots:
+        root = os.path.abspath(root)
+        if os.path.isdir(root):
+            directories.append(root)
+        else:
+            files.add(root)
+    return directories, files
+
+
+class PollingWatcher():
+    """Detects changes by comparing mtime and size snapshots of the watched trees."""
+
+    def __init__(self, roots:list[str], interval:float=0.5) -> None:
+        self.directories, self.files = split_roots(roots)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} for every watched file."""
+        snapshot = {}
+        for directory in self.directories:
+            for dir_path, _, file_names in os.walk(directory):
+                for file_name in file_names:
+                    self.add_stat(snapshot, os.path.join(dir_path, file_name))
+        for file_path in self.files:
+            self.add_stat(snapshot, file_path)
+        return snapshot
+
+    def add_stat(self, snapshot:dict, path:str) -> None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self, timeout:float) -> set[str]:
+        """Wait up to timeout seconds and return the paths that changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self.scan()
+            changed = {path for path in current.keys() | self.snapshot.keys() if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if len(changed) > 0 or time.monotonic() >= deadline:
+                return changed
+            time.sleep(min(self.interval, max(0, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher():
+    """Detects changes with Linux inotify through libc, watching every directory of the trees."""
+
+    def __init__(self, roots:list[str]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.directories, self.files = split_roots(roots)
+        for directory in self.directories:
+            self.add_tree(directory)
+        for file_path in self.files:
+            # editors often replace files by renaming, so watch the parent directory.
+            self.add_watch(os.path.dirname(file_path))
+
+    def add_watch(self, directory:str) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.watches[wd] = directory
+
+    def add_tree(self, directory:str) -> None:
+        for dir_path, _, _ in os.walk(directory):
+            self.add_watch(dir_path)
+
+    def is_watched(self, path:str) -> bool:
+        if path in self.files:
+            return True
+        return any(path == directory or path.startswith(directory + os.sep) for directory in self.directories)
+
+    def read_events(self) -> set[str]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # events were lost, report every watched root as changed.
+                    changed.update(self.directories)
+                    changed.update(self.files)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                if self.is_watched(path):
+                    changed.add(path)
+
+    def poll(self, timeout:float) -> set[str]:
+        """Wait up to timeout seconds and return the paths that changed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if len(ready) == 0:
+            return set()
+        changed = self.read_events()
+        time.sleep(DEBOUNCE_SECONDS)
+        changed.update(self.read_events())
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def create_watcher(roots:list[str]) -> InotifyWatcher|PollingWatcher:
+    """Return an inotify watcher where available, else a polling one."""
+    try:
+        return InotifyWatcher(roots)
+    except (OSError, AttributeError):
+        return PollingWatcher(roots)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(directory:str, port:int) -> ThreadingHTTPServer:
+    """Serve directory over HTTP from a background thread."""
+    server = ThreadingHTTPServer(("", port), partial(QuietHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def watch_and_serve(roots:list[str], on_change:Callable[[set[str]], str], directory:str, port:int) -> None:
+    """Serve directory and call on_change with the changed paths until interrupted."""
+    watcher = create_watcher(roots)
+    server = serve(directory, port)
+    log = get_log()
+    log.summary(f"Serving {directory} on http://localhost:{server.server_address[1]} ({type(watcher).__name__}), Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.poll(1.0)
+            if len(changed) == 0:
+                continue
+            start = time.perf_counter()
+            try:
+                summary = on_change(changed)
+            except Exception as error:
+                log.error(f"Rebuild failed: {error}")
+                continue
+            elapsed = time.perf_counter() - start
+            log.event("rebuild", seconds=round(elapsed, 6), changed=len(changed))
+            log.summary(f"{summary} in {elapsed * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        watcher.close()
@@ -0,0 +1 @@
+python3 src/main.py watch "$@"
\ No newline at end of file